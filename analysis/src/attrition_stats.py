@@ -0,0 +1,52 @@
+"""
+多维度离职率引擎
+===================================================
+基于 0/1 整数列「是否离职编码」，一次性计算多个分组维度的人数、离职人数和离职率，
+输出整洁长表（维度、分组、人数、离职人数、离职率），各章节图表统一从该表读取。
+
+- 每个维度只做一次整数编码 + np.bincount，不再反复 groupby/value_counts/unstack
+- 某分组没有离职人员时离职率为 0（原写法会因缺少「是」列而 KeyError）；人数为 0 的空分组离职率为 NaN
+"""
+
+import numpy as np
+import pandas as pd
+
+STATS_COLUMNS = ["维度", "分组", "人数", "离职人数", "离职率"]
+
+
+def _group_codes(series):
+    """返回 (整数分组编码, 分组取值)：分类列沿用类别顺序，其他列按取值排序（与 groupby 一致）"""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series.cat.codes.to_numpy(), list(series.cat.categories)
+    codes, uniques = pd.factorize(series, sort=True)
+    return codes, list(uniques)
+
+
+def attrition_table(df, dims, target="是否离职编码"):
+    """计算 dims 中每个维度各分组的人数、离职人数和离职率（%），返回整洁长表"""
+    y = df[target].to_numpy(dtype=np.float64)
+    frames = []
+    for dim in dims:
+        codes, groups = _group_codes(df[dim])
+        valid = codes >= 0  # 缺失值不计入任何分组
+        counts = np.bincount(codes[valid], minlength=len(groups))
+        leavers = np.bincount(codes[valid], weights=y[valid], minlength=len(groups))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            rates = np.where(counts > 0, leavers / counts * 100, np.nan)
+        frames.append(pd.DataFrame({
+            "维度": dim,
+            "分组": pd.Series(groups, dtype=object),
+            "人数": counts,
+            "离职人数": leavers.astype(np.int64),
+            "离职率": rates,
+        }))
+    if not frames:
+        return pd.DataFrame(columns=STATS_COLUMNS)
+    return pd.concat(frames, ignore_index=True)[STATS_COLUMNS]
+
+
+def rate_series(table, dim):
+    """从整洁长表中取出某维度的离职率，返回以分组为索引的 Series（索引名为维度名）"""
+    part = table[table["维度"] == dim]
+    return pd.Series(part["离职率"].to_numpy(), index=pd.Index(part["分组"].tolist(), name=dim),
+                     name="离职率")
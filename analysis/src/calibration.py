@@ -0,0 +1,51 @@
+"""
+离职概率校准
+===================================================
+随机森林输出的是各树投票比例，数值上并不等于真实离职概率，重新训练后整体分布也会漂移。
+本模块用折外（held-out）预测拟合单调映射，把模型分数校准为概率：
+
+- isotonic：保序回归，分段线性映射，保存为节点数组 (x, y)
+- sigmoid：Platt 缩放，p = 1 / (1 + exp(-(coef × 分数 + intercept)))
+
+校准参数只包含少量数值，写入模型制品的 meta.json；应用时只需 NumPy（np.interp / exp），
+评分脚本无需导入 sklearn。拟合函数才会按需导入 sklearn。
+"""
+
+import numpy as np
+
+CALIBRATION_METHODS = ("isotonic", "sigmoid")
+
+
+def fit_calibration(scores, y, method="isotonic"):
+    """用折外分数和真实标签拟合校准映射，返回可 JSON 序列化的参数字典；method 为 None 时不校准"""
+    if method is None:
+        return None
+    scores = np.asarray(scores, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    if method == "isotonic":
+        from sklearn.isotonic import IsotonicRegression
+        iso = IsotonicRegression(y_min=0.0, y_max=1.0, out_of_bounds="clip").fit(scores, y)
+        return {"method": "isotonic", "x": iso.X_thresholds_.tolist(), "y": iso.y_thresholds_.tolist()}
+    if method == "sigmoid":
+        from sklearn.linear_model import LogisticRegression
+        lr = LogisticRegression(C=1e6).fit(scores[:, None], y)
+        return {"method": "sigmoid", "coef": float(lr.coef_[0, 0]), "intercept": float(lr.intercept_[0])}
+    raise ValueError(f"未知的校准方法：{method}（可选：{', '.join(CALIBRATION_METHODS)}）")
+
+
+def apply_calibration(calibration, scores):
+    """将模型分数映射为校准后的概率；calibration 为 None 时原样返回"""
+    scores = np.asarray(scores, dtype=np.float64)
+    if calibration is None:
+        return scores
+    if calibration["method"] == "isotonic":
+        # 超出拟合范围时取端点值，与 IsotonicRegression(out_of_bounds="clip") 一致
+        return np.interp(scores, calibration["x"], calibration["y"])
+    if calibration["method"] == "sigmoid":
+        return 1.0 / (1.0 + np.exp(-(calibration["coef"] * scores + calibration["intercept"])))
+    raise ValueError(f"未知的校准方法：{calibration['method']}")
+
+
+def brier_score(proba, y):
+    """Brier 分数（概率与 0/1 标签的均方误差），越小表示概率越准确"""
+    return float(np.mean((np.asarray(proba, dtype=np.float64) - np.asarray(y, dtype=np.float64)) ** 2))
@@ -0,0 +1,131 @@
+"""
+图表渲染调度器
+===================================================
+图表构建完成后立即提交到进程池，由多个工作进程并行调用 kaleido 导出 PNG（以及 HTML），
+主进程继续构建后续图表；生成 Word 报告前调用 collect() 等待全部完成并逐图汇报失败。
+
+- 工作进程数可配置（workers），workers <= 1 时在主进程内串行渲染
+- 内容寻址缓存：以图表 JSON 与渲染参数（宽、高、缩放）的 SHA-256 为键记录在 images 目录的清单中，
+  键未变且文件仍在时直接复用已有 HTML/PNG，不再调用 kaleido；collect() 打印命中/未命中统计
+- 进程池优先使用 forkserver 启动方式（服务进程只预加载本模块），不支持的平台（如 Windows）使用 spawn：
+  ProcessPoolExecutor 在首次 submit() 时才启动工作进程，此时报告阶段线程已在运行，不能在多线程状态下 fork
+- submit() 可在多个线程（并发执行的报告阶段）中同时调用；start() 可提前创建进程池
+"""
+
+import hashlib
+import json
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import plotly.io as pio
+
+
+def _render_chart(fig_json, html_path, png_path, width, height, scale):
+    """工作进程：由 JSON 还原图表并写出 HTML 和 PNG"""
+    fig = pio.from_json(fig_json)
+    fig.write_html(html_path)
+    fig.write_image(png_path, scale=scale, width=width, height=height)
+
+
+def _pool_context():
+    """forkserver 只需预加载本模块，无需在服务进程中重新导入调用方脚本"""
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("forkserver")
+        context.set_forkserver_preload([__name__])
+        return context
+    return multiprocessing.get_context("spawn")
+
+
+CACHE_MANIFEST = ".chart_cache.json"
+
+
+def chart_key(fig_json, width, height, scale):
+    """图表缓存键：图表 JSON 与渲染参数的 SHA-256"""
+    payload = f"{fig_json}|{width}x{height}@{scale}".encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()
+
+
+class ChartRenderer:
+    """并行图表渲染池：submit() 排队（命中缓存则跳过），collect() 汇总结果"""
+
+    def __init__(self, images_dir, workers=None, use_cache=True):
+        self.images_dir = images_dir
+        self.use_cache = use_cache
+        self._manifest_path = images_dir / CACHE_MANIFEST
+        self._manifest = {}
+        if use_cache and self._manifest_path.exists():
+            with open(self._manifest_path, encoding="utf-8") as f:
+                self._manifest = json.load(f)
+        self._keys = {}      # 文件名 -> 本次提交的缓存键
+        self._hits = []      # 命中缓存、未重新渲染的文件名
+        self.workers = os.cpu_count() if workers is None else workers
+        self._executor = None
+        self._pending = {}   # 文件名 -> Future（并行）或异常/None（串行）
+        self._lock = threading.Lock()
+
+    def start(self):
+        """创建渲染进程池（已创建或串行模式时不做任何事）"""
+        with self._lock:
+            if self.workers > 1 and self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=_pool_context())
+
+    def submit(self, fig, filename, width=800, height=500, scale=2):
+        """提交一张图表的渲染任务（并行模式下立即返回）；内容未变化时直接复用已有文件"""
+        fig_json = fig.to_json()
+        html_path = self.images_dir / f"{filename}.html"
+        png_path = self.images_dir / f"{filename}.png"
+        key = chart_key(fig_json, width, height, scale)
+        if (self.use_cache and self._manifest.get(filename) == key
+                and html_path.exists() and png_path.exists()):
+            with self._lock:
+                self._hits.append(filename)
+            return
+        args = (fig_json, str(html_path), str(png_path), width, height, scale)
+        if self.workers <= 1:
+            try:
+                _render_chart(*args)
+                result = None
+            except Exception as e:
+                result = e
+        else:
+            self.start()
+            result = self._executor.submit(_render_chart, *args)
+        with self._lock:
+            self._keys[filename] = key
+            self._pending[filename] = result
+
+    def collect(self):
+        """
+        等待所有渲染任务完成，逐图打印结果并更新缓存清单，
+        返回 {文件名: 错误信息} 形式的失败列表
+        """
+        failures = {}
+        for filename in self._hits:
+            print(f"  ♻️ 复用缓存: {filename}.png")
+        for filename, task in self._pending.items():
+            error = task
+            if task is not None and not isinstance(task, Exception):
+                error = task.exception()
+            if error is None:
+                self._manifest[filename] = self._keys[filename]
+                print(f"  ✅ 已保存: {filename}.png")
+            else:
+                self._manifest.pop(filename, None)
+                # 只保留第一行非空信息（kaleido 的错误信息通常很长）
+                message = next((line.strip() for line in str(error).splitlines() if line.strip()), repr(error))
+                failures[filename] = message
+                print(f"  ❌ 渲染失败: {filename}.png（{message}）")
+        if self.use_cache:
+            with open(self._manifest_path, "w", encoding="utf-8") as f:
+                json.dump(self._manifest, f, ensure_ascii=False, indent=2)
+        print(f"  📊 图表缓存：命中 {len(self._hits)} 张，渲染 {len(self._pending)} 张"
+              f"（失败 {len(failures)} 张）")
+        self._pending.clear()
+        self._keys.clear()
+        self._hits.clear()
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+        return failures
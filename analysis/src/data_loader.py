@@ -0,0 +1,87 @@
+"""
+分析数据加载层
+===================================================
+- 以汉化 Excel 文件的内容哈希（SHA-256）与加载器版本（LOADER_VERSION、分类列定义）为键，将解析结果缓存为 Parquet 列式快照；
+  修改类型恢复规则或列式转换后递增 LOADER_VERSION，旧快照即失效
+- 源文件未变化时直接读取快照，跳过耗时的 pd.read_excel；源文件变化后自动重建并清理旧快照
+- 加载后恢复分类列的 category 类型（学历、满意度等有序列按业务顺序设为有序类别）
+"""
+
+import hashlib
+import importlib.util
+import pandas as pd
+
+# 有序分类列及其业务顺序（与汉化脚本 VALUE_TRANSLATION 一致）
+SATISFACTION_ORDER = ["低", "中", "高", "非常高"]
+ORDERED_CATEGORIES = {
+    "学历": ["大专以下", "大专", "本科", "硕士", "博士"],
+    "环境满意": SATISFACTION_ORDER,
+    "人际关系满意": SATISFACTION_ORDER,
+    "工作满意": SATISFACTION_ORDER,
+    "敬业度": SATISFACTION_ORDER,
+    "工作与生活平衡": ["差", "好", "更好", "最好"],
+    "绩效评级": ["低", "良好", "优秀", "杰出"],
+    "股权激励等级": ["无", "低级", "中级", "高级"],
+}
+
+# 无序分类列
+UNORDERED_CATEGORIES = ["性别", "婚姻状况", "部门", "岗位", "专业", "出差频率",
+                        "是否加班", "是否离职", "是否成年"]
+
+# 加载器版本：restore_dtypes 或列式转换逻辑变化时递增，使已有快照失效
+LOADER_VERSION = 1
+
+
+def file_digest(path, block_size=1 << 20):
+    """分块计算文件内容的 SHA-256，避免一次性读入大文件"""
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            sha.update(block)
+    return sha.hexdigest()
+
+
+def restore_dtypes(df):
+    """恢复分类列的 category 类型；有序列的取值超出业务顺序时退化为无序类别"""
+    for col, order in ORDERED_CATEGORIES.items():
+        if col in df.columns:
+            if df[col].dropna().isin(order).all():
+                df[col] = pd.Categorical(df[col], categories=order, ordered=True)
+            else:
+                df[col] = df[col].astype("category")
+    for col in UNORDERED_CATEGORIES:
+        if col in df.columns:
+            df[col] = df[col].astype("category")
+    return df
+
+
+def snapshot_key(digest, sheet_name):
+    """列式快照的缓存键：源文件内容哈希 + 工作表 + 加载器版本 + 分类列定义"""
+    schema = repr((LOADER_VERSION, sheet_name, ORDERED_CATEGORIES, UNORDERED_CATEGORIES))
+    return hashlib.sha256(f"{digest}|{schema}".encode("utf-8")).hexdigest()
+
+
+def load_dataset(source, cache_dir, sheet_name="数据"):
+    """
+    加载汉化数据集，返回 (DataFrame, 源文件内容哈希)
+    - 缓存命中：读取 cache_dir 下对应哈希的 Parquet 快照（不解析 Excel）
+    - 缓存失效：解析 Excel、恢复分类类型、写出新快照，并删除同一源文件的旧快照
+    - 未安装 pyarrow 时直接解析 Excel，不使用缓存
+    """
+    digest = file_digest(source)
+    cache_file = cache_dir / f"{source.stem}_{snapshot_key(digest, sheet_name)[:16]}.parquet"
+    if importlib.util.find_spec("pyarrow") is None:  # Parquet 缓存依赖 pyarrow
+        print("  ⚠️ 未安装 pyarrow，不使用列式缓存（pip install pyarrow）")
+        return restore_dtypes(pd.read_excel(source, sheet_name=sheet_name)), digest
+
+    if cache_file.exists():
+        print(f"  ⚡ 命中列式缓存：{cache_file.name}")
+        return pd.read_parquet(cache_file), digest
+
+    print("  📖 缓存未命中，解析 Excel 并生成列式快照...")
+    df = restore_dtypes(pd.read_excel(source, sheet_name=sheet_name))
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    for stale in cache_dir.glob(f"{source.stem}_*.parquet"):
+        stale.unlink()
+    df.to_parquet(cache_file, index=False)
+    return df, digest
@@ -0,0 +1,113 @@
+"""
+测试集置换重要性（并行）
+===================================================
+基于不纯度的 feature_importances_ 偏向取值多的连续特征（如月收入、年龄），且只反映训练集上的分裂；
+置换重要性在留出的测试集上逐个打乱特征，以 AUC 的下降量衡量模型对该特征的依赖：
+
+- 「特征 × 重复」展开为独立任务，由进程池并行计算；每个任务只打乱一列，随机种子由 (random_state, 特征, 重复)
+  决定，结果与进程数、调度顺序无关
+- 工作进程不接收任何数组：测试集直接取特征矩阵（feature_store.py）中连续的测试行块，模型以模型制品
+  （model_artifact.py）加载，二者都是只读内存映射，所有进程共享操作系统页缓存中的同一份数据
+- 测试行块始终保持只读：每个任务只生成被打乱的那一列，按 BLOCK_ROWS 行分块复制到该进程的工作缓冲区、
+  替换该列后评分；缓冲区每个进程只分配一次，大小与测试集行数无关
+- 进程池在报告阶段线程内创建，优先使用 forkserver 启动方式（不支持时用 spawn），不在多线程状态下 fork
+- 结果包含各特征 AUC 下降量的均值、标准差及 95% 置信区间半宽（正态近似，用于图表误差线）
+"""
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from sklearn.metrics import roc_auc_score
+
+from feature_store import FeatureStore
+from model_artifact import load_artifact
+
+N_REPEATS = 10
+Z_95 = 1.96
+BLOCK_ROWS = 4096  # 每次评分的行数，即每个进程工作缓冲区的行数
+
+# 工作进程状态：测试集特征（只读映射）、工作缓冲区、标签与模型（由 _init_worker 打开一次，供该进程的全部任务使用）
+_STATE = {}
+
+
+def _open_state(store_path, store_meta, artifact_dir):
+    store = FeatureStore(store_path, store_meta)
+    model, _ = load_artifact(artifact_dir)
+    X = store.X[store.n_train:]
+    y = np.asarray(store.y[store.n_train:])
+    buffer = np.empty((max(1, min(BLOCK_ROWS, len(X))), X.shape[1]), dtype=X.dtype)
+    return {"X": X, "buffer": buffer, "y": y, "model": model, "columns": store.feature_cols}
+
+
+def _score(state, X):
+    """模型分数；按 DataFrame 训练的 sklearn 模型（梯度提升树）传入带列名的零拷贝视图"""
+    if hasattr(state["model"], "feature_names_in_"):
+        X = pd.DataFrame(X, columns=state["columns"], copy=False)
+    return state["model"].predict_proba(X)[:, 1]
+
+
+def _init_worker(store_path, store_meta, artifact_dir):
+    _STATE.update(_open_state(store_path, store_meta, artifact_dir))
+
+
+def _auc_drop(state, baseline, feature, repeat, random_state):
+    """打乱一列后的 AUC 下降量（测试集不被修改，逐块复制到工作缓冲区后替换该列评分）"""
+    rng = np.random.default_rng([random_state, feature, repeat])
+    X, buffer = state["X"], state["buffer"]
+    column = np.asarray(X[:, feature])[rng.permutation(len(X))]
+    scores = np.empty(len(X))
+    for start in range(0, len(X), len(buffer)):
+        block = buffer[:min(len(buffer), len(X) - start)]
+        np.copyto(block, X[start:start + len(block)])
+        block[:, feature] = column[start:start + len(block)]
+        scores[start:start + len(block)] = _score(state, block)
+    return baseline - roc_auc_score(state["y"], scores)
+
+
+def _worker_task(baseline, feature, repeat, random_state):
+    return _auc_drop(_STATE, baseline, feature, repeat, random_state)
+
+
+def _pool_context():
+    """forkserver 只需预加载本模块，无需在服务进程中重新导入调用方脚本"""
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("forkserver")
+        context.set_forkserver_preload([__name__])
+        return context
+    return multiprocessing.get_context("spawn")
+
+
+def permutation_importances(store, artifact_dir, n_repeats=N_REPEATS, random_state=42, workers=None):
+    """
+    在特征矩阵的测试行上计算置换重要性，返回 (结果表, 基准 AUC)
+    结果表每行一个特征：特征、重要性（AUC 平均下降量）、标准差、置信区间（95% 半宽），按重要性降序
+    store: FeatureStore；artifact_dir: 已保存的模型制品目录（模型须与 store 的特征列一致）
+    workers: 进程数（默认 CPU 核心数；<= 1 时在当前进程串行计算）
+    """
+    state = _open_state(store.path, store.meta, artifact_dir)
+    baseline = roc_auc_score(state["y"], _score(state, state["X"]))
+    n_features = len(store.feature_cols)
+    tasks = [(baseline, feature, repeat, random_state)
+             for feature in range(n_features) for repeat in range(n_repeats)]
+
+    workers = os.cpu_count() if workers is None else workers
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks)), mp_context=_pool_context(),
+                                 initializer=_init_worker,
+                                 initargs=(store.path, store.meta, artifact_dir)) as pool:
+            drops = list(pool.map(_worker_task, *zip(*tasks), chunksize=max(1, len(tasks) // (workers * 4))))
+    else:
+        drops = [_auc_drop(state, *task) for task in tasks]
+
+    drops = np.asarray(drops).reshape(n_features, n_repeats)
+    std = drops.std(axis=1, ddof=1) if n_repeats > 1 else np.zeros(n_features)
+    table = pd.DataFrame({
+        "特征": store.feature_cols,
+        "重要性": drops.mean(axis=1),
+        "标准差": std,
+        "置信区间": Z_95 * std / np.sqrt(n_repeats),
+    }).sort_values("重要性", ascending=False, kind="stable").reset_index(drop=True)
+    return table, baseline
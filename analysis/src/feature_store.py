@@ -0,0 +1,155 @@
+"""
+离职预测特征矩阵
+===================================================
+模型选择、校准、预测、风险表各阶段共用的模型输入矩阵，由「特征矩阵」阶段只构建一次，
+不再在每个阶段从 DataFrame 重新切片 df[feature_cols]（每次都把混合类型的列复制为新的 float64 数组）：
+
+    feature_store/
+    ├── X.npy  y.npy  ids.npy   # 特征矩阵（行 × 特征，连续 float32）、离职标签（int8）、员工编号（行索引）
+    └── meta.json               # 特征列及其源数据类型、schema 哈希、训练数据哈希、训练集行数
+
+- 行按训练集、测试集的划分顺序排列：训练集为前 n_train 行，测试集为其余行，二者都是连续行块，
+  取用时为零拷贝视图（frame 将视图包装为 DataFrame 同样不复制，模型仍记录特征名）
+- float32 与 sklearn 树模型内部精度一致：随机森林训练、推理前本就会将特征转为 float32
+- 数组以只读内存映射打开，按需分页读入；阶段缓存中只保存路径和 meta，不保存数组本身
+- schema 哈希由特征列名及其源数据类型计算；打开时核对 schema 与数据哈希，磁盘上的矩阵已被重建则报错
+- 构建时逐列写入磁盘上的内存映射数组，不在内存中生成完整的 float64 中间矩阵
+- meta.json 最后写入，存在即表示矩阵完整
+"""
+
+import hashlib
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+META_FILE = "meta.json"
+ARRAYS = ("X", "y", "ids")
+
+
+def schema_hash(dtypes, feature_cols):
+    """特征列名及其源数据类型的哈希（dtypes 为 Series 或 dict）"""
+    schema = [[col, str(dtypes[col])] for col in feature_cols]
+    return hashlib.sha256(json.dumps(schema, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+class FeatureStore:
+    """磁盘上的特征矩阵；数组在首次访问时以只读内存映射打开"""
+
+    def __init__(self, path, meta):
+        self.path = Path(path)
+        self.meta = meta
+        self._arrays = None
+        self._index = None
+
+    def __getstate__(self):
+        # 阶段缓存只保存路径和 meta，读取缓存后重新映射磁盘上的数组
+        return {"path": self.path, "meta": self.meta}
+
+    def __setstate__(self, state):
+        self.__init__(state["path"], state["meta"])
+
+    @property
+    def feature_cols(self):
+        return self.meta["feature_cols"]
+
+    @property
+    def n_train(self):
+        return self.meta["n_train"]
+
+    @property
+    def schema_hash(self):
+        return self.meta["schema_hash"]
+
+    @property
+    def source_dtypes(self):
+        """各特征列在源 DataFrame 中的数据类型（矩阵本身统一为 float32）"""
+        return self.meta["dtypes"]
+
+    def _load(self):
+        if self._arrays is None:
+            meta_file = self.path / META_FILE
+            if not meta_file.exists():
+                raise FileNotFoundError(f"特征矩阵不完整或不存在：{meta_file}")
+            with open(meta_file, encoding="utf-8") as f:
+                meta = json.load(f)
+            if (meta["schema_hash"], meta["data_hash"]) != (self.schema_hash, self.meta["data_hash"]):
+                raise ValueError(f"特征矩阵已被重建（schema 或数据已变化），请重新执行「特征矩阵」阶段：{self.path}")
+            self._arrays = {name: np.load(self.path / f"{name}.npy", mmap_mode="r") for name in ARRAYS}
+        return self._arrays
+
+    @property
+    def X(self):
+        """全部行的特征矩阵（只读内存映射，训练集在前、测试集在后）"""
+        return self._load()["X"]
+
+    @property
+    def y(self):
+        return self._load()["y"]
+
+    @property
+    def ids(self):
+        return self._load()["ids"]
+
+    def frame(self, rows=slice(None)):
+        """指定行块（切片）的零拷贝 DataFrame 视图，列名为特征列"""
+        return pd.DataFrame(self.X[rows], columns=self.feature_cols, copy=False)
+
+    def train(self):
+        """(X_train, y_train)：训练集视图"""
+        return self.frame(slice(None, self.n_train)), self.y[:self.n_train]
+
+    def test(self):
+        """(X_test, y_test)：测试集视图"""
+        return self.frame(slice(self.n_train, None)), self.y[self.n_train:]
+
+    def positions(self, ids):
+        """员工编号 -> 矩阵行号；不在矩阵中的员工编号报错"""
+        if self._index is None:
+            self._index = pd.Index(self.ids)
+        positions = self._index.get_indexer(np.asarray(ids))
+        if (positions < 0).any():
+            missing = np.asarray(ids)[positions < 0]
+            raise KeyError(f"特征矩阵中没有以下员工编号：{', '.join(map(str, missing[:5]))}"
+                           f"{' 等' if len(missing) > 5 else ''}")
+        return positions
+
+    def files(self):
+        """矩阵包含的全部文件（用于判断阶段缓存是否仍然有效）"""
+        return [self.path / f"{name}.npy" for name in ARRAYS] + [self.path / META_FILE]
+
+
+def build_store(path, df, feature_cols, target_col, id_col, order, n_train, data_hash):
+    """
+    按 order（训练集行号在前、测试集行号在后）将 df 的特征列写为 float32 特征矩阵，返回 FeatureStore
+    n_train 为训练集行数；id_col 为行索引列（员工编号，需唯一）
+    """
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+    (path / META_FILE).unlink(missing_ok=True)
+    order = np.asarray(order)
+    ids = df[id_col].to_numpy()[order]
+    if not pd.Index(ids).is_unique:
+        raise ValueError(f"{id_col} 存在重复值，无法作为特征矩阵的行索引")
+
+    X = np.lib.format.open_memmap(path / "X.npy", mode="w+", dtype=np.float32,
+                                  shape=(len(order), len(feature_cols)))
+    for j, col in enumerate(feature_cols):
+        X[:, j] = df[col].to_numpy(dtype=np.float32)[order]
+    X.flush()
+    del X
+    np.save(path / "y.npy", df[target_col].to_numpy(dtype=np.int8)[order])
+    np.save(path / "ids.npy", ids)
+
+    meta = {
+        "feature_cols": list(feature_cols),
+        "dtypes": {col: str(df[col].dtype) for col in feature_cols},
+        "schema_hash": schema_hash(df.dtypes, feature_cols),
+        "data_hash": data_hash,
+        "n_rows": len(order),
+        "n_train": int(n_train),
+    }
+    with open(path / META_FILE, "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+    return FeatureStore(path, meta)
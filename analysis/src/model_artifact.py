@@ -0,0 +1,99 @@
+"""
+离职预测模型制品
+===================================================
+以目录形式保存编译后的随机森林（见 forest_compiler.py），替代整棵森林的 pickle：
+
+    attrition_model/
+    ├── feature.npy  threshold.npy  child.npy  is_leaf.npy  missing_left.npy  value.npy  roots.npy
+    └── meta.json    # 特征列及其源数据类型与模型输入类型、概率校准参数、风险等级阈值及其策略、训练数据哈希、模型参数等
+
+- 每个数组单独存为 .npy，加载时以只读内存映射打开：不反序列化、不复制，
+  按需从磁盘分页读入，多个评分进程共享操作系统页缓存中的同一份数据
+- meta.json 最后写入，存在即表示制品完整
+- 梯度提升树后端（backend = "hgb"）没有编译格式，模型以 joblib 文件 model.joblib 保存在同一目录，
+  加载时需要 sklearn；meta.json 内容相同，评分脚本无需区分后端
+"""
+
+import datetime
+import json
+from pathlib import Path
+
+import numpy as np
+
+from forest_compiler import CompiledForest
+
+FORMAT_VERSION = 3  # 2：随机森林制品增加 missing_left（缺失值路由方向）；3：meta 区分源数据类型与模型输入类型
+META_FILE = "meta.json"
+MODEL_FILE = "model.joblib"  # 梯度提升树后端的模型文件
+
+
+def save_artifact(path, forest, feature_cols, dtypes, risk_thresholds, data_hash, params=None,
+                  calibration=None, threshold_policy=None, storage_dtype="float32"):
+    """
+    保存模型制品；forest 为 CompiledForest（随机森林）或已训练的 HistGradientBoostingClassifier，
+    dtypes 为训练数据中各特征列的源数据类型（Series 或 dict，供评分时核对输入列），
+    storage_dtype 为模型实际输入的数据类型（特征矩阵统一为 float32），
+    calibration 为 calibration.fit_calibration 的结果（评分时先校准再按阈值分级）
+    """
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+    (path / META_FILE).unlink(missing_ok=True)
+    # 先清除两种后端的模型文件，切换后端后不残留旧模型
+    for stale in artifact_files(path, "rf") + artifact_files(path, "hgb"):
+        stale.unlink(missing_ok=True)
+    if isinstance(forest, CompiledForest):
+        backend = "rf"
+        for name in CompiledForest.ARRAYS:
+            np.save(path / f"{name}.npy", np.ascontiguousarray(getattr(forest, name)))
+        structure = {"n_trees": forest.n_trees, "max_depth": forest.max_depth}
+    else:
+        import joblib
+        backend = "hgb"
+        joblib.dump(forest, path / MODEL_FILE, compress=3)
+        structure = {"n_iter": int(forest.n_iter_)}
+    meta = {
+        "format_version": FORMAT_VERSION,
+        "backend": backend,
+        "created_at": datetime.datetime.now().isoformat(timespec="seconds"),
+        "data_hash": data_hash,
+        "feature_cols": list(feature_cols),
+        "dtypes": {col: str(dtypes[col]) for col in feature_cols},
+        "storage_dtype": str(storage_dtype),
+        "calibration": calibration,
+        "risk_thresholds": dict(risk_thresholds),
+        "threshold_policy": threshold_policy,
+        **structure,
+        "params": params or {},
+    }
+    with open(path / META_FILE, "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+
+
+def load_artifact(path, mmap=True):
+    """
+    加载模型制品，返回 (模型, meta)；模型为 CompiledForest（随机森林，mmap=False 时将数组完整读入内存）
+    或 HistGradientBoostingClassifier，二者均提供 predict_proba
+    """
+    path = Path(path)
+    meta_file = path / META_FILE
+    if not meta_file.exists():
+        raise FileNotFoundError(f"模型制品不完整或不存在：{meta_file}")
+    with open(meta_file, encoding="utf-8") as f:
+        meta = json.load(f)
+    if meta.get("format_version") != FORMAT_VERSION:
+        raise ValueError(f"不支持的模型制品版本：{meta.get('format_version')}")
+    if meta.get("backend", "rf") == "hgb":
+        import joblib
+        return joblib.load(path / MODEL_FILE), meta
+    arrays = {name: np.load(path / f"{name}.npy", mmap_mode="r" if mmap else None)
+              for name in CompiledForest.ARRAYS}
+    forest = CompiledForest(**arrays, max_depth=meta["max_depth"], feature_names=meta["feature_cols"])
+    return forest, meta
+
+
+def artifact_files(path, backend="rf"):
+    """制品包含的全部文件（用于判断阶段缓存是否仍然有效）"""
+    path = Path(path)
+    if backend == "hgb":
+        return [path / MODEL_FILE, path / META_FILE]
+    return [path / f"{name}.npy" for name in CompiledForest.ARRAYS] + [path / META_FILE]
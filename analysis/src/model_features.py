@@ -0,0 +1,23 @@
+"""
+离职预测特征定义
+===================================================
+综合报告（full_analysis_report.py）与流式训练脚本（streaming_training.py）共用的特征列、
+无序类别特征和目标列，保证两条训练路径使用同一套特征
+"""
+
+# 特征选择（使用 v5.0 已有的数值列和编码列，排除目标变量）
+FEATURE_COLS = [
+    '年龄', '职级', '离家距离', '月收入', '调薪幅度',
+    '总工龄', '本企业工龄', '现岗年限', '晋升间隔', '与现任经理共事年限',
+    '跳槽次数', '年度培训次数',
+    '学历编码', '环境满意编码', '人际关系满意编码', '工作满意编码',
+    '敬业度编码', '工作与生活平衡编码', '绩效评级编码', '股权激励等级编码',
+    '是否加班编码', '婚姻状况编码', '出差频率编码'
+]
+
+# 取值为无序类别的编码列：不应按编码大小切分或加权
+# （梯度提升树按原生类别特征处理，线性模型做独热编码）
+CATEGORICAL_COLS = ["婚姻状况编码", "出差频率编码"]
+
+# 目标变量（0/1编码）
+TARGET_COL = "是否离职编码"
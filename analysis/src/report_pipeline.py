@@ -0,0 +1,249 @@
+"""
+报告阶段调度器（DAG）
+===================================================
+将综合报告拆分为带显式依赖的命名阶段，由 PipelineRunner 负责：
+
+1. 选择性执行：只运行目标阶段及其（未命中缓存的）上游依赖
+2. 并发执行：依赖已满足的独立阶段在线程池中同时运行（图表渲染本身在 ChartRenderer 进程池中）；
+   声明了相同资源（resources）的阶段互斥执行，例如 plotly 的全局模板对象不是线程安全的，
+   构建图表的阶段需依次执行，但可与不画图的阶段（如风险表）及后台渲染重叠
+3. 结果缓存：每个阶段的缓存键 = 阶段函数的依赖哈希（见 dependency_digest）+ 阶段配置 + 全局指纹（数据哈希等）
+   + 上游阶段缓存键，键未变且阶段声明的产出文件仍存在时直接读取 pickle 结果，不再执行（也不再执行其上游）
+
+阶段函数的依赖由其字节码引用的全局名自动推导，无需手工登记辅助函数或共享模块：同模块的辅助函数（递归）计入源码，
+同模块的纯数据常量（字符串、数字、路径及其列表、字典等）计入 repr，项目内模块（及其导入的项目内模块）计入完整源码
+"""
+
+import hashlib
+import inspect
+import pickle
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from pathlib import Path, PurePath
+
+
+class PipelineError(Exception):
+    """调度配置错误（未知阶段、依赖环、阶段参数与数据不符等），入口脚本将其作为一行提示输出，而非异常堆栈"""
+
+
+def _global_names(code):
+    """代码对象（含嵌套的函数、lambda、推导式）引用的全局名"""
+    names = set(code.co_names)
+    for const in code.co_consts:
+        if inspect.iscode(const):
+            names |= _global_names(const)
+    return names
+
+
+def _plain_repr(value):
+    """纯数据常量（None、布尔、数字、字符串、路径及由它们组成的列表、元组、集合、字典）的稳定 repr，其他对象返回 None"""
+    if value is None or isinstance(value, (bool, int, float, str, bytes, PurePath)):
+        return repr(value)
+    if isinstance(value, dict):
+        items = [(_plain_repr(k), _plain_repr(v)) for k, v in value.items()]
+        if any(k is None or v is None for k, v in items):
+            return None
+        return "{" + ", ".join(f"{k}: {v}" for k, v in items) + "}"
+    if isinstance(value, (list, tuple, set, frozenset)):
+        items = [_plain_repr(v) for v in value]
+        if any(item is None for item in items):
+            return None
+        if isinstance(value, (set, frozenset)):
+            items.sort()  # 集合的迭代顺序随字符串哈希种子变化
+        return f"{type(value).__name__}[{', '.join(items)}]"
+    return None
+
+
+def dependency_digest(funcs, roots):
+    """
+    函数及其依赖的哈希，roots 为项目源码目录：
+    - 函数源码，及其引用的同模块函数（递归）、同模块类的源码
+    - 引用的同模块纯数据常量的 repr（运行时按命令行参数修改的配置字典取修改后的值）
+    - 引用的项目内模块（文件位于 roots 下；引用其中的函数、类或实例均算）的完整源码，
+      并递归纳入这些模块导入的项目内模块
+    """
+    roots = [Path(root).resolve() for root in roots]
+    sources, constants, modules = {}, {}, {}
+
+    def project_module(obj):
+        module = inspect.getmodule(obj)
+        path = getattr(module, "__file__", None)
+        if path and any(Path(path).resolve().is_relative_to(root) for root in roots):
+            return module
+        return None
+
+    def add_module(module):
+        if module.__name__ in modules:
+            return
+        modules[module.__name__] = Path(module.__file__).read_bytes()
+        for value in vars(module).values():
+            if _plain_repr(value) is None:
+                dep = project_module(value)
+                if dep is not None:
+                    add_module(dep)
+
+    def add_function(func):
+        key = f"{func.__module__}.{func.__qualname__}"
+        if key in sources:
+            return
+        sources[key] = inspect.getsource(func)
+        for name in sorted(_global_names(func.__code__)):
+            if name not in func.__globals__:
+                continue
+            value = func.__globals__[name]
+            text = _plain_repr(value)
+            if text is not None:
+                constants[name] = text
+            elif inspect.isfunction(value) and value.__globals__ is func.__globals__:
+                add_function(value)
+            elif inspect.isclass(value) and value.__module__ == func.__module__:
+                sources[f"{value.__module__}.{value.__qualname__}"] = inspect.getsource(value)
+            else:
+                module = project_module(value)
+                if module is not None and module.__name__ != func.__module__:
+                    add_module(module)
+
+    for func in funcs:
+        add_function(func)
+    sha = hashlib.sha256()
+    for part in (sources, constants):
+        for key in sorted(part):
+            sha.update(f"{key}\n{part[key]}\n".encode("utf-8"))
+    for name in sorted(modules):
+        sha.update(name.encode("utf-8"))
+        sha.update(modules[name])
+    return sha.hexdigest()
+
+
+class Stage:
+    """
+    报告阶段
+    - func(inputs) -> dict：inputs 为 {依赖阶段名: 该阶段输出}；输出中的 "files" 列出阶段产出的文件，
+      文件缺失时缓存视为失效
+    - cache=False 的阶段每次都重新执行（如数据加载、Word 生成）
+    - resources：阶段占用的共享资源名，占用同一资源的阶段不会同时执行
+    - config：阶段函数引用的全局名以外的额外配置，其 repr 计入缓存键
+      （函数引用的模块级常量、辅助函数和项目内模块已由 dependency_digest 自动计入）
+    """
+
+    def __init__(self, name, func, deps=(), cache=True, resources=(), config=None):
+        self.name = name
+        self.func = func
+        self.config = config
+        self.deps = list(deps)
+        self.cache = cache
+        self.resources = set(resources)
+
+
+class PipelineRunner:
+    """按依赖关系选择性、并发地执行报告阶段，并复用未变化阶段的缓存结果"""
+
+    def __init__(self, stages, cache_dir, fingerprint="", max_workers=None, use_cache=True, source_roots=()):
+        """source_roots：项目源码目录，阶段函数引用的、位于其中的模块以完整源码计入缓存键"""
+        self.stages = {stage.name: stage for stage in stages}
+        self.source_roots = list(source_roots)
+        self.order = [stage.name for stage in stages]
+        self.cache_dir = Path(cache_dir)
+        self.fingerprint = fingerprint
+        self.max_workers = max_workers
+        self.use_cache = use_cache
+        self.keys = {}
+        for name in self.order:
+            self._stage_key(name)
+
+    def _stage_key(self, name, visiting=()):
+        """递归计算阶段缓存键（上游任一阶段变化都会传导到下游）"""
+        if name in self.keys:
+            return self.keys[name]
+        if name in visiting:
+            raise PipelineError(f"阶段依赖存在环：{' -> '.join(visiting + (name,))}")
+        stage = self.stages[name]
+        sha = hashlib.sha256()
+        sha.update(name.encode("utf-8"))
+        sha.update(dependency_digest([stage.func], self.source_roots).encode("utf-8"))
+        sha.update(repr(stage.config).encode("utf-8"))
+        sha.update(self.fingerprint.encode("utf-8"))
+        for dep in stage.deps:
+            if dep not in self.stages:
+                raise PipelineError(f"阶段 {name} 依赖未知阶段 {dep}")
+            sha.update(self._stage_key(dep, visiting + (name,)).encode("utf-8"))
+        self.keys[name] = sha.hexdigest()
+        return self.keys[name]
+
+    def _cache_file(self, name):
+        return self.cache_dir / f"stage_{name}_{self.keys[name][:16]}.pkl"
+
+    def _load_cached(self, stage):
+        """读取阶段缓存；缓存不存在、已失效或产出文件缺失时返回 None"""
+        if not (self.use_cache and stage.cache):
+            return None
+        cache_file = self._cache_file(stage.name)
+        if not cache_file.exists():
+            return None
+        with open(cache_file, "rb") as f:
+            outputs = pickle.load(f)
+        if not all(Path(p).exists() for p in outputs.get("files", [])):
+            return None
+        return outputs
+
+    def _save_cached(self, stage, outputs):
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        for stale in self.cache_dir.glob(f"stage_{stage.name}_*.pkl"):
+            stale.unlink()
+        with open(self._cache_file(stage.name), "wb") as f:
+            pickle.dump(outputs, f)
+
+    def _execute(self, stage, inputs):
+        start = time.perf_counter()
+        outputs = stage.func(inputs) or {}
+        if stage.cache:
+            self._save_cached(stage, outputs)
+        print(f"  ⏱️ 阶段「{stage.name}」完成，用时 {time.perf_counter() - start:.1f} 秒")
+        return outputs
+
+    def run(self, targets=None):
+        """执行目标阶段（默认全部），返回 {阶段名: 输出}"""
+        targets = list(targets or self.order)
+        unknown = [t for t in targets if t not in self.stages]
+        if unknown:
+            raise PipelineError(f"未知阶段：{', '.join(unknown)}（可选：{', '.join(self.order)}）")
+
+        # 自目标向上游查找：命中缓存的阶段直接使用结果，其上游无需执行
+        results, to_run = {}, set()
+
+        def visit(name):
+            if name in results or name in to_run:
+                return
+            stage = self.stages[name]
+            cached = self._load_cached(stage)
+            if cached is not None:
+                results[name] = cached
+                print(f"  ♻️ 阶段「{name}」未变化，复用缓存结果")
+                return
+            to_run.add(name)
+            for dep in stage.deps:
+                visit(dep)
+
+        for target in targets:
+            visit(target)
+
+        # 按 stages 声明顺序提交就绪阶段（依赖已完成且所需资源空闲）
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            running, busy = {}, set()
+            while to_run or running:
+                for name in self.order:
+                    stage = self.stages[name]
+                    if (name in to_run and all(dep in results for dep in stage.deps)
+                            and not stage.resources & busy):
+                        to_run.discard(name)
+                        busy |= stage.resources
+                        inputs = {dep: results[dep] for dep in stage.deps}
+                        running[pool.submit(self._execute, stage, inputs)] = name
+                if not running:
+                    raise RuntimeError(f"以下阶段的依赖无法满足：{', '.join(sorted(to_run))}")
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    busy -= self.stages[name].resources
+                    results[name] = future.result()
+        return results
@@ -0,0 +1,48 @@
+"""
+离职风险归因
+===================================================
+将编译森林的逐特征贡献（见 forest_compiler.CompiledForest.contributions）整理为每位员工的主要风险因素，
+写入风险表的「高风险员工」工作表与 Word 报告的高风险员工示例：
+
+- 贡献为模型分数（校准前的森林投票占比）的分解：基准值 + 各特征贡献 = 模型分数；
+  校准是单调变换，不改变同一员工各因素的排序
+- 每人取贡献为正（推高离职风险）的前 k 个特征，按贡献降序，如「是否加班 +0.121；月收入 +0.085」
+- 整批向量化：np.argpartition 一次选出所有员工的前 k 列，只在拼接文字时逐人处理
+"""
+
+import numpy as np
+import pandas as pd
+
+TOP_K = 3
+DRIVER_COL = "主要风险因素"
+
+
+def display_name(feature):
+    """特征的展示名：编码列去掉「编码」后缀（如 是否加班编码 -> 是否加班）"""
+    return feature[:-2] if feature.endswith("编码") else feature
+
+
+def top_drivers(contrib, feature_cols, k=TOP_K):
+    """
+    每行贡献最大的前 k 个正贡献特征，返回与行数等长的字符串数组（没有正贡献的员工为「—」）
+    contrib: (员工数, 特征数) 的贡献数组
+    """
+    contrib = np.asarray(contrib, dtype=np.float64)
+    k = min(k, contrib.shape[1])
+    names = np.array([display_name(col) for col in feature_cols], dtype=object)
+    top = np.argpartition(-contrib, k - 1, axis=1)[:, :k]
+    values = np.take_along_axis(contrib, top, axis=1)
+    order = np.argsort(-values, axis=1, kind="stable")
+    top = np.take_along_axis(top, order, axis=1)
+    values = np.take_along_axis(values, order, axis=1)
+    labels = [
+        "；".join(f"{name} {value:+.3f}" for name, value in zip(names[cols], vals) if value > 0) or "—"
+        for cols, vals in zip(top, values)
+    ]
+    return np.array(labels, dtype=object)
+
+
+def driver_table(ids, contrib, feature_cols, k=TOP_K, id_col="员工编号"):
+    """员工编号与主要风险因素的对照表（以员工编号为索引），供风险表按员工编号合并"""
+    return pd.DataFrame({DRIVER_COL: top_drivers(contrib, feature_cols, k)},
+                        index=pd.Index(np.asarray(ids), name=id_col))
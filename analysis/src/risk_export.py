@@ -0,0 +1,119 @@
+"""
+离职风险名单分片导出
+===================================================
+按部门（或岗位等任意负责人维度，可组合多列）将已评分的在职员工拆分为多个小文件，
+每位 HRBP 只需查看自己负责的分片：
+
+- 每个分片一个文件：带超级表格式的 Excel（见 excel_writer.py）或 CSV（UTF-8 with BOM），按离职概率降序
+- 待写出的行数较多时由进程池并行写出；进程池在报告阶段线程内创建，因此优先使用 forkserver 启动方式（不支持时用 spawn），
+  不在多线程状态下 fork
+- 文件名由维度取值清理非法字符后生成，缺失值记为「未知」；不同取值清理后重名（含仅大小写不同）时，
+  重名的各分片追加取值的短哈希后缀，不会互相覆盖
+- 输出目录下同时写出分片索引（分片索引.csv）：每个分片的维度取值、文件名、人数、高风险人数
+- 每次导出前清除目录中旧的分片文件，维度取值消失后不会残留过期名单
+"""
+
+import hashlib
+import multiprocessing
+import os
+import re
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+from excel_writer import write_formatted_workbook
+
+SHARD_FORMATS = ("xlsx", "csv")
+INDEX_FILE = "分片索引.csv"
+SHEET_NAME = "风险名单"
+# 待写出的总行数少于此值时串行写出：启动工作进程（导入 pandas、openpyxl）约需 0.7 秒，
+# 而风险名单（7 列）的 Excel 每秒可写出约 6 千行，行数较少时进程开销超过并行收益
+MIN_PARALLEL_ROWS = 20_000
+MISSING_VALUE = "未知"  # 维度取值缺失的分片
+
+# 文件名中不允许出现的字符（Windows 保留字符及控制字符）
+_UNSAFE_CHARS = re.compile(r'[\\/:*?"<>|\x00-\x1f]')
+
+
+def shard_filename(values, fmt, suffix=""):
+    """
+    由分片维度取值生成文件名，如 ("研发部", "研究科学家") -> 研发部_研究科学家.xlsx；
+    缺失值记为「未知」，suffix 非空时追加在文件名末尾（用于区分重名分片）
+    """
+    stem = "_".join(MISSING_VALUE if pd.isna(value) else _UNSAFE_CHARS.sub("_", str(value)).strip() or "未填写"
+                    for value in values)
+    return f"{stem}_{suffix}.{fmt}" if suffix else f"{stem}.{fmt}"
+
+
+def shard_filenames(groups, fmt):
+    """
+    各分片的文件名（与 groups 顺序一致）；清理后重名（不区分大小写）的分片追加维度取值的 8 位哈希，
+    哈希只由取值决定，与分片顺序无关
+    """
+    names = [shard_filename(values, fmt) for values in groups]
+    counts = Counter(name.lower() for name in names)
+    return [shard_filename(values, fmt, hashlib.sha1(repr(values).encode("utf-8")).hexdigest()[:8])
+            if counts[name.lower()] > 1 else name
+            for values, name in zip(groups, names)]
+
+
+def _write_shard(path, df, fmt):
+    """工作进程：写出一个分片文件"""
+    if fmt == "csv":
+        df.to_csv(path, index=False, encoding="utf-8-sig")
+    else:
+        write_formatted_workbook(path, [(SHEET_NAME, df, SHEET_NAME, ())])
+
+
+def _pool_context():
+    """forkserver 只需预加载本模块，无需在服务进程中重新导入调用方脚本"""
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("forkserver")
+        context.set_forkserver_preload([__name__])
+        return context
+    return multiprocessing.get_context("spawn")
+
+
+def export_shards(scores, keys, out_dir, columns=None, fmt="xlsx", workers=None):
+    """
+    将评分结果按 keys 分片写入 out_dir，返回分片索引（DataFrame）
+    scores: 含 keys、离职概率、风险等级 的在职员工评分表
+    columns: 分片文件中的列（默认全部列），分片维度列总是放在最前
+    workers: 写出进程数（默认 CPU 核心数；<= 1、只有一个分片或总行数少于 MIN_PARALLEL_ROWS 时在当前进程串行写出）
+    """
+    keys = list(keys)
+    if fmt not in SHARD_FORMATS:
+        raise ValueError(f"未知的分片格式：{fmt}（可选：{', '.join(SHARD_FORMATS)}）")
+    missing = [key for key in keys if key not in scores.columns]
+    if missing:
+        raise ValueError(f"评分结果中没有分片维度列：{', '.join(missing)}")
+    columns = keys + [col for col in (columns or scores.columns) if col not in keys]
+
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    for stale in out_dir.iterdir():
+        if stale.suffix.lower() in (".xlsx", ".csv"):
+            stale.unlink()
+
+    ordered = scores[columns].sort_values("离职概率", ascending=False, kind="stable")
+    groups = [(values if isinstance(values, tuple) else (values,), shard)
+              for values, shard in ordered.groupby(keys, sort=True, observed=True, dropna=False)]
+    rows, tasks = [], []
+    for (values, shard), filename in zip(groups, shard_filenames([values for values, _ in groups], fmt)):
+        rows.append({**dict(zip(keys, values)), "文件": filename, "人数": len(shard),
+                     "高风险人数": int((shard["风险等级"] == "高风险").sum())})
+        tasks.append((str(out_dir / filename), shard.reset_index(drop=True), fmt))
+
+    workers = os.cpu_count() if workers is None else workers
+    if workers > 1 and len(tasks) > 1 and len(ordered) >= MIN_PARALLEL_ROWS:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks)), mp_context=_pool_context()) as pool:
+            list(pool.map(_write_shard, *zip(*tasks), chunksize=max(1, len(tasks) // (workers * 4))))
+    else:
+        for task in tasks:
+            _write_shard(*task)
+
+    index = pd.DataFrame(rows, columns=keys + ["文件", "人数", "高风险人数"])
+    index.to_csv(out_dir / INDEX_FILE, index=False, encoding="utf-8-sig")
+    return index
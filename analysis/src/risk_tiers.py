@@ -0,0 +1,131 @@
+"""
+离职风险分级
+===================================================
+综合报告（风险表阶段）与独立评分脚本 score_employees.py 共用同一套分级规则；
+阈值同时写入模型制品（model_artifact.py），评分时按模型训练时的阈值分级
+
+- 分级为向量化分箱：对整列概率做一次 np.searchsorted，不再逐人调用 Python 函数
+- 结果为有序分类（低风险 < 中风险 < 高风险），统计表按该顺序输出，并保留人数为 0 的等级
+- 阈值优化：对分数降序排序一次，向量化计算每个候选切点（每个不同分数值）的标记人数、
+  命中离职人数，再按容量（每月可面谈人数）或成本比值选出阈值
+"""
+
+import numpy as np
+import pandas as pd
+
+# 风险等级（由低到高）
+RISK_LEVELS = ["低风险", "中风险", "高风险"]
+
+# 默认风险等级阈值：离职概率 ≥ 阈值即属于该等级，其余为低风险
+RISK_THRESHOLDS = {"高风险": 0.7, "中风险": 0.4}
+
+
+def validate_thresholds(thresholds):
+    """检查阈值齐全且满足 0 ≤ 中风险 ≤ 高风险，返回浮点数形式的阈值字典（阈值大于 1 表示该等级不标记任何人）"""
+    missing = [level for level in RISK_LEVELS[1:] if level not in thresholds]
+    if missing:
+        raise ValueError(f"缺少风险阈值：{', '.join(missing)}")
+    medium, high = float(thresholds["中风险"]), float(thresholds["高风险"])
+    if not 0.0 <= medium <= high:
+        raise ValueError(f"风险阈值需满足 0 ≤ 中风险 ≤ 高风险（当前 中风险={medium}，高风险={high}）")
+    return {"高风险": high, "中风险": medium}
+
+
+def risk_tiers(proba, thresholds=RISK_THRESHOLDS):
+    """
+    将离职概率数组分级，返回有序分类（与输入等长）
+    概率 ≥ 高风险阈值为高风险，≥ 中风险阈值为中风险，其余为低风险；缺失概率不分级
+    """
+    thresholds = validate_thresholds(thresholds)
+    proba = np.asarray(proba, dtype=np.float64)
+    cuts = np.array([thresholds["中风险"], thresholds["高风险"]])
+    codes = np.searchsorted(cuts, proba, side="right").astype(np.int8)
+    codes[np.isnan(proba)] = -1
+    return pd.Categorical.from_codes(codes, dtype=pd.CategoricalDtype(RISK_LEVELS, ordered=True))
+
+
+def tier_counts(tiers):
+    """各风险等级人数及占比（%），按 低 → 高 排列，人数为 0 的等级同样列出"""
+    tiers = pd.Series(tiers)
+    counts = tiers.value_counts(sort=False).reindex(RISK_LEVELS, fill_value=0)
+    table = pd.DataFrame({"风险等级": RISK_LEVELS, "人数": counts.to_numpy()})
+    table["占比"] = (table["人数"] / max(len(tiers), 1) * 100).round(1)
+    return table
+
+
+def describe_thresholds(thresholds):
+    """阈值的文字描述（保留 3 位有效数字），用于报告正文，如 ("≥0.7", "0.4-0.7", "<0.4")"""
+    high, medium = thresholds["高风险"], thresholds["中风险"]
+    return f"≥{high:.3g}", f"{medium:.3g}-{high:.3g}", f"<{medium:.3g}"
+
+
+# ==================== 阈值优化 ====================
+# 阈值策略：
+# - {"method": "capacity", "高风险": 50, "中风险": 150}：按人数容量，标记人数（含更高等级）不超过容量
+# - {"method": "cost", "高风险": 2.0, "中风险": 8.0}：漏报一名离职者的成本是一次干预成本的多少倍，
+#   取期望成本最小的阈值；干预越重（高风险）成本比值通常越低，阈值越高
+# - {"method": "fixed", "高风险": 0.7, "中风险": 0.4}：直接使用给定阈值
+THRESHOLD_METHODS = ("capacity", "cost", "fixed")
+
+
+def _candidate_cuts(scores):
+    """
+    分数降序排序后的候选切点：每个不同分数值都是一个候选阈值（概率 ≥ 阈值者被标记）
+    返回 (排序下标, 各候选阈值, 各候选的标记人数)；另含「不标记任何人」的候选（阈值略大于最高分）
+    """
+    order = np.argsort(-scores, kind="stable")
+    ranked = scores[order]
+    # 每个不同分数值在降序序列中最后出现的位置
+    last = np.flatnonzero(np.r_[ranked[1:] != ranked[:-1], True])
+    top = np.nextafter(ranked[0], np.inf) if len(ranked) else 1.0
+    cuts = np.r_[top, ranked[last]]
+    flagged = np.r_[0, last + 1]
+    return order, last, cuts, flagged
+
+
+def capacity_threshold(scores, capacity):
+    """标记人数不超过 capacity 的最低阈值（同分员工要么全部标记、要么全部不标记）"""
+    scores = np.asarray(scores, dtype=np.float64)
+    _, _, cuts, flagged = _candidate_cuts(scores)
+    return float(cuts[np.flatnonzero(flagged <= capacity)[-1]])
+
+
+def cost_threshold(scores, y, cost_ratio):
+    """期望成本 = 被标记的非离职者人数 + cost_ratio × 未被标记的离职者人数，返回成本最小的阈值"""
+    scores = np.asarray(scores, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    order, last, cuts, flagged = _candidate_cuts(scores)
+    hits = np.r_[0.0, np.cumsum(y[order])[last]]
+    cost = (flagged - hits) + cost_ratio * (y.sum() - hits)
+    return float(cuts[np.argmin(cost)])  # 成本相同时取较高阈值（标记更少的人）
+
+
+def describe_policy(policy):
+    """阈值策略的文字描述，用于日志和报告正文"""
+    method = policy["method"]
+    if method == "capacity":
+        return f"按容量（高风险名单不超过 {policy['高风险']} 人，中、高风险合计不超过 {policy['中风险']} 人）"
+    if method == "cost":
+        return (f"按成本比值（漏报一名离职者的成本相当于高风险干预 {policy['高风险']:g} 次、"
+                f"中风险干预 {policy['中风险']:g} 次，取期望成本最小的阈值）")
+    return "按固定阈值"
+
+
+def optimize_thresholds(policy, scores=None, y=None):
+    """
+    按阈值策略选出中/高风险阈值
+    - capacity：scores 为待分级人群（如在职员工）的校准概率
+    - cost：scores、y 为带标签样本（如训练集折外预测）的校准概率与真实离职标签
+    """
+    method = policy["method"]
+    if method == "fixed":
+        return validate_thresholds(policy)
+    if method == "capacity":
+        high = capacity_threshold(scores, policy["高风险"])
+        medium = capacity_threshold(scores, policy["中风险"])
+    elif method == "cost":
+        high = cost_threshold(scores, y, policy["高风险"])
+        medium = cost_threshold(scores, y, policy["中风险"])
+    else:
+        raise ValueError(f"未知的阈值策略：{method}（可选：{', '.join(THRESHOLD_METHODS)}）")
+    return validate_thresholds({"高风险": high, "中风险": min(medium, high)})
@@ -0,0 +1,367 @@
+"""
+在职员工离职风险批量评分
+===================================================
+直接加载综合报告保存的模型制品（attrition_model/ 目录，见 model_artifact.py），
+对任意汉化版 CSV / Parquet 文件分块评分，输出每位员工的离职概率和风险等级，
+无需重新训练模型、渲染图表或生成 Word 报告。
+
+- 随机森林制品以只读内存映射加载，纯 NumPy 推理，无需导入 sklearn；多个评分进程共享同一份页缓存
+  （梯度提升树后端的制品为 joblib 模型文件，加载时需要 sklearn）
+- 分块读取（CSV 按 chunksize 行、Parquet 按行组批次），只读取员工编号、在职状态和特征列，内存占用恒定
+- 按制品记录的特征列及其源数据类型校验输入（列齐全、均为数值），再转换为模型输入类型；
+  模型分数按制品记录的校准参数转换为离职概率，再按制品记录的阈值分级
+- 也可通过 --model 指定 joblib 保存的 sklearn 模型（.pkl），此时不做校准、使用默认风险阈值
+- 默认只对在职员工（是否离职 == "否"）评分，--all 对全部员工评分
+- 输出 CSV（UTF-8 with BOM）或 Parquet（按输出文件扩展名）
+- 增量刷新（--incremental）：保存每位员工的特征哈希与离职概率（评分状态），下次评分时按员工编号
+  向量化关联上次状态，特征未变的员工直接沿用上次概率，只对新增和特征变化的员工调用模型；
+  模型制品变化后自动全量重新评分。同时输出风险等级上升/下降的员工明细
+
+用法：
+    python score_employees.py                                   # 对汉化数据集评分
+    python score_employees.py 新员工数据.csv -o 风险评分.csv --chunksize 50000
+    python score_employees.py 本月员工数据.csv --incremental      # 每月增量刷新风险名单
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from calibration import apply_calibration
+from data_loader import file_digest
+from model_artifact import load_artifact, META_FILE
+from risk_tiers import risk_tiers, RISK_LEVELS, RISK_THRESHOLDS
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+# ==================== 路径配置 ====================
+BASE_DIR = Path(__file__).parent.parent.parent  # 项目根目录
+OUTPUT_DIR = BASE_DIR / "analysis" / "output"
+MODEL_ARTIFACT_DIR = OUTPUT_DIR / "attrition_model"
+DEFAULT_INPUT = BASE_DIR / "output" / "IBM_HR_员工流失数据_本土化版.csv"
+DEFAULT_OUTPUT = OUTPUT_DIR / "在职员工离职风险评分.csv"
+DEFAULT_STATE = OUTPUT_DIR / "离职风险评分状态.parquet"
+DEFAULT_DELTA = OUTPUT_DIR / "离职风险等级变动.csv"
+CHUNK_SIZE = 100_000
+
+ID_COL = "员工编号"
+STATUS_COL = "是否离职"
+HASH_COL = "特征哈希"
+
+
+# ==================== 模型与特征结构 ====================
+def load_model(path):
+    """
+    返回 (模型, 特征结构, 风险阈值)；特征结构中的 calibration 为概率校准参数
+    - 目录：模型制品（内存映射加载编译森林，不导入 sklearn）
+    - .pkl：joblib 保存的 sklearn 模型，特征列取自 feature_names_in_
+    """
+    if Path(path).is_dir():
+        forest, meta = load_artifact(path)
+        return forest, meta, meta["risk_thresholds"]
+    import joblib
+    model = joblib.load(path)
+    feature_cols = list(model.feature_names_in_)
+    schema = {"feature_cols": feature_cols, "dtypes": {col: "float64" for col in feature_cols},
+              "storage_dtype": "float64", "calibration": None}
+    return model, schema, RISK_THRESHOLDS
+
+
+def prepare_features(chunk, schema):
+    """
+    按特征结构取出特征列并转换为模型输入类型（storage_dtype）；
+    缺少特征列，或训练时为数值的列在输入中不是数值（如文本）时抛出 ValueError
+    """
+    feature_cols = schema["feature_cols"]
+    missing = [col for col in feature_cols if col not in chunk.columns]
+    if missing:
+        raise ValueError(f"输入文件缺少模型特征列：{', '.join(missing)}")
+    mismatched = [f"{col}（训练时 {schema['dtypes'][col]}，输入 {chunk[col].dtype}）" for col in feature_cols
+                  if pd.api.types.is_numeric_dtype(schema["dtypes"][col])
+                  and not pd.api.types.is_numeric_dtype(chunk[col].dtype)]
+    if mismatched:
+        raise ValueError(f"输入文件的特征列类型与训练时不符：{', '.join(mismatched)}")
+    return chunk[feature_cols].astype(schema["storage_dtype"])
+
+
+# ==================== 分块读取 ====================
+def iter_chunks(path, columns, chunksize=CHUNK_SIZE):
+    """按块读取 CSV / Parquet 中的指定列（文件中不存在的列跳过）"""
+    path = Path(path)
+    wanted = set(columns)
+    if path.suffix.lower() == ".parquet":
+        if pq is None:
+            raise ImportError("读取 Parquet 需要安装 pyarrow（pip install pyarrow）")
+        parquet_file = pq.ParquetFile(path)
+        names = [name for name in parquet_file.schema_arrow.names if name in wanted]
+        for batch in parquet_file.iter_batches(batch_size=chunksize, columns=names):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, usecols=lambda col: col in wanted, chunksize=chunksize)
+
+
+# ==================== 评分 ====================
+def _select_rows(chunk, include_departed):
+    """默认只保留在职员工"""
+    if not include_departed and STATUS_COL in chunk.columns:
+        chunk = chunk[chunk[STATUS_COL] == "否"]
+    return chunk
+
+
+def _predict(model, features, schema):
+    """模型分数按特征结构中的校准参数转换为离职概率"""
+    return apply_calibration(schema.get("calibration"), model.predict_proba(features)[:, 1])
+
+
+def score_chunk(model, chunk, schema, thresholds=RISK_THRESHOLDS, include_departed=False):
+    """对一块数据评分，返回 员工编号、离职概率、风险等级 三列"""
+    chunk = _select_rows(chunk, include_departed)
+    scores = pd.DataFrame({ID_COL: chunk[ID_COL].to_numpy()})
+    if len(chunk):
+        scores["离职概率"] = _predict(model, prepare_features(chunk, schema), schema)
+    else:
+        scores["离职概率"] = pd.Series(dtype="float64")
+    scores["风险等级"] = risk_tiers(scores["离职概率"], thresholds)
+    return scores
+
+
+def refresh_chunk(model, chunk, schema, previous, thresholds=RISK_THRESHOLDS, include_departed=False):
+    """
+    增量评分一块数据，返回 (评分结果, 调用模型的人数)；评分结果另含特征哈希列
+    previous 为上次评分状态（以员工编号为索引）：特征哈希相同的员工沿用上次离职概率，
+    新增员工和特征变化的员工重新评分；风险等级总是按当前阈值重新划分
+    """
+    chunk = _select_rows(chunk, include_departed)
+    features = prepare_features(chunk, schema)
+    hashes = feature_hashes(features)
+    position = previous.index.get_indexer(chunk[ID_COL])
+    reuse = position >= 0
+    reuse[reuse] = previous[HASH_COL].to_numpy()[position[reuse]] == hashes[reuse]
+
+    proba = np.empty(len(chunk), dtype=np.float64)
+    proba[reuse] = previous["离职概率"].to_numpy()[position[reuse]]
+    rescore = ~reuse
+    if rescore.any():
+        proba[rescore] = _predict(model, features[rescore], schema)
+    scores = pd.DataFrame({ID_COL: chunk[ID_COL].to_numpy(), "离职概率": proba,
+                           "风险等级": risk_tiers(proba, thresholds), HASH_COL: hashes})
+    return scores, int(rescore.sum())
+
+
+def score_file(input_path, output_path, model, schema, thresholds=RISK_THRESHOLDS,
+               chunksize=CHUNK_SIZE, include_departed=False, previous=None):
+    """
+    分块评分并追加写出，返回 ({风险等级: 人数}, 本次评分状态)
+    previous 为上次评分状态时增量评分（见 refresh_chunk），否则全部重新评分、本次评分状态为 None
+    """
+    columns = [ID_COL, STATUS_COL] + schema["feature_cols"]
+    output_path = Path(output_path)
+    as_parquet = output_path.suffix.lower() == ".parquet"
+    if as_parquet and pq is None:
+        raise ImportError("输出 Parquet 需要安装 pyarrow（pip install pyarrow）")
+
+    counts, total, states = {}, 0, []
+    parquet_writer = csv_file = None
+    try:
+        if not as_parquet:
+            # 只打开一次文件句柄，BOM 仅在文件开头写入一次
+            csv_file = open(output_path, "w", encoding="utf-8-sig", newline="")
+        for i, chunk in enumerate(iter_chunks(input_path, columns, chunksize)):
+            if previous is None:
+                scores = score_chunk(model, chunk, schema, thresholds, include_departed)
+                note = ""
+            else:
+                state, rescored = refresh_chunk(model, chunk, schema, previous, thresholds, include_departed)
+                states.append(state)
+                scores = state.drop(columns=HASH_COL)
+                note = f"，其中重新评分 {rescored:,} 人"
+            if as_parquet:
+                table = pa.Table.from_pandas(scores, preserve_index=False)
+                if parquet_writer is None:
+                    parquet_writer = pq.ParquetWriter(output_path, table.schema, compression="zstd")
+                parquet_writer.write_table(table)
+            else:
+                scores.to_csv(csv_file, index=False, header=(i == 0))
+            for level, count in scores["风险等级"].value_counts().items():
+                counts[level] = counts.get(level, 0) + count
+            total += len(scores)
+            print(f"  ✓ 第 {i + 1} 块: 评分 {len(scores):,} 人{note}（累计 {total:,} 人）")
+    finally:
+        if parquet_writer is not None:
+            parquet_writer.close()
+        if csv_file is not None:
+            csv_file.close()
+    if previous is None:
+        return counts, None
+    state = pd.concat(states, ignore_index=True) if states else empty_state().reset_index()
+    state, duplicates = dedupe_state(state)
+    if duplicates:
+        print(f"  ⚠️ 输入中有 {duplicates:,} 行的员工编号重复（如多期快照合并评分），评分状态只保留每人最后一行")
+    return counts, state
+
+
+# ==================== 增量刷新 ====================
+def model_fingerprint(path):
+    """模型标识：制品 meta.json（或 .pkl 文件）的内容哈希；重新训练或调整阈值后即变化"""
+    path = Path(path)
+    return file_digest(path / META_FILE if path.is_dir() else path)
+
+
+def feature_hashes(features):
+    """逐行特征哈希（uint64）：特征取值完全相同的行哈希相同"""
+    return pd.util.hash_pandas_object(features, index=False).to_numpy()
+
+
+def empty_state():
+    """没有上次评分状态时使用的空状态（全部员工视为新增）"""
+    return pd.DataFrame({"离职概率": pd.Series(dtype="float64"),
+                         "风险等级": pd.Categorical([], categories=RISK_LEVELS, ordered=True),
+                         HASH_COL: pd.Series(dtype="uint64")},
+                        index=pd.Index([], name=ID_COL))
+
+
+def dedupe_state(state):
+    """员工编号重复时只保留最后一行（文件中靠后的即最新快照），返回 (去重后的状态, 去掉的行数)"""
+    duplicated = state[ID_COL].duplicated(keep="last").to_numpy()
+    if not duplicated.any():
+        return state, 0
+    return state.loc[~duplicated].reset_index(drop=True), int(duplicated.sum())
+
+
+def load_state(path):
+    """
+    读取上次评分状态，返回 (以员工编号为索引的状态表, 模型标识)；文件不存在时返回 (None, None)
+    状态按员工编号建索引前先去重（保留最后一行），索引唯一才能按员工编号查找
+    """
+    if not Path(path).exists():
+        return None, None
+    table = pq.read_table(path)
+    model_id = (table.schema.metadata or {}).get(b"model_id", b"").decode()
+    state, duplicates = dedupe_state(table.to_pandas())
+    if duplicates:
+        print(f"  ⚠️ 评分状态中有 {duplicates:,} 行的员工编号重复，只保留每人最后一行")
+    return state.set_index(ID_COL), model_id
+
+
+def save_state(path, state, model_id):
+    """保存本次评分状态（员工编号、离职概率、风险等级、特征哈希），模型标识写入 Parquet 元数据"""
+    table = pa.Table.from_pandas(state[[ID_COL, "离职概率", "风险等级", HASH_COL]], preserve_index=False)
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}), b"model_id": model_id.encode()})
+    pq.write_table(table, path, compression="zstd")
+
+
+def risk_changes(previous, state):
+    """
+    对比上次与本次评分状态，返回 (各类员工人数, 风险等级变动明细)
+    人数分为 新增、特征变化、未变化、已离开（上次有、本次没有）；
+    变动明细只列出两次都在、风险等级上升或下降的员工，上升在前，各自按本次离职概率降序
+    """
+    position = previous.index.get_indexer(state[ID_COL])
+    known = position >= 0
+    same = known.copy()
+    same[known] = previous[HASH_COL].to_numpy()[position[known]] == state[HASH_COL].to_numpy()[known]
+    summary = {"新增": int((~known).sum()), "特征变化": int((known & ~same).sum()),
+               "未变化": int(same.sum()), "已离开": int((~previous.index.isin(state[ID_COL])).sum())}
+
+    before = pd.Categorical(previous["风险等级"], categories=RISK_LEVELS, ordered=True).codes[position[known]]
+    current = state.loc[known]
+    after = pd.Categorical(current["风险等级"], categories=RISK_LEVELS, ordered=True).codes
+    moved = before != after
+    changes = pd.DataFrame({
+        ID_COL: current[ID_COL].to_numpy()[moved],
+        "上次风险等级": np.asarray(RISK_LEVELS, dtype=object)[before[moved]],
+        "本次风险等级": np.asarray(RISK_LEVELS, dtype=object)[after[moved]],
+        "变动": np.where(after[moved] > before[moved], "上升", "下降"),
+        "上次离职概率": previous["离职概率"].to_numpy()[position[known]][moved],
+        "本次离职概率": current["离职概率"].to_numpy()[moved],
+    })
+    changes = changes.sort_values(["变动", "本次离职概率"], ascending=[True, False], kind="stable")
+    return summary, changes.reset_index(drop=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="使用已保存的离职预测模型批量评分")
+    parser.add_argument("input", nargs="?", default=str(DEFAULT_INPUT),
+                        help="汉化版 CSV / Parquet 文件（默认汉化数据集 CSV）")
+    parser.add_argument("-o", "--output", default=str(DEFAULT_OUTPUT),
+                        help="评分结果文件（.csv 或 .parquet）")
+    parser.add_argument("--model", default=str(MODEL_ARTIFACT_DIR),
+                        help="模型制品目录（默认）或 joblib 保存的 sklearn 模型 .pkl")
+    parser.add_argument("--chunksize", type=int, default=CHUNK_SIZE,
+                        help=f"每块行数（默认 {CHUNK_SIZE:,}）")
+    parser.add_argument("--all", action="store_true", help="对全部员工评分（默认只评在职员工）")
+    parser.add_argument("--incremental", action="store_true",
+                        help="增量刷新：只对新增和特征变化的员工重新评分，并输出风险等级变动明细")
+    parser.add_argument("--state", default=str(DEFAULT_STATE), help="增量刷新的评分状态文件（Parquet）")
+    parser.add_argument("--delta", default=str(DEFAULT_DELTA), help="风险等级变动明细文件（CSV）")
+    args = parser.parse_args()
+
+    print("="*60)
+    print("🔮 在职员工离职风险批量评分")
+    print("="*60)
+    for path in (args.input, args.model):
+        if not Path(path).exists():
+            print(f"❌ 错误: 找不到文件 {path}")
+            print("请先运行 full_analysis_report.py 训练并保存模型")
+            return
+
+    start = time.perf_counter()
+    try:
+        model, schema, thresholds = load_model(args.model)
+    except (FileNotFoundError, ValueError) as e:
+        print(f"❌ 模型加载失败: {e}")
+        return
+    print(f"📦 模型: {args.model}（{len(schema['feature_cols'])} 个特征，加载 "
+          f"{(time.perf_counter() - start) * 1000:.0f} ms）")
+    previous = last_state = None
+    if args.incremental:
+        if pq is None:
+            print("❌ 增量刷新需要安装 pyarrow（pip install pyarrow）")
+            return
+        model_id = model_fingerprint(args.model)
+        last_state, last_model_id = load_state(args.state)
+        if last_state is None:
+            print(f"🆕 未找到评分状态 {args.state}，本次全量评分")
+        elif last_model_id != model_id:
+            print("🔄 模型制品已变化，本次全量重新评分")
+        else:
+            previous = last_state
+            print(f"♻️ 上次评分状态: {len(last_state):,} 人，特征未变化的员工沿用上次离职概率")
+        if previous is None:
+            previous = empty_state()
+
+    print(f"📖 分块读取: {args.input}（每块 {args.chunksize:,} 行）")
+    try:
+        counts, state = score_file(args.input, args.output, model, schema, thresholds,
+                                   args.chunksize, args.all, previous)
+    except (ValueError, ImportError) as e:
+        print(f"❌ 评分失败: {e}")
+        return
+
+    total = sum(counts.values())
+    print(f"✅ 评分结果已保存: {args.output}（共 {total:,} 人，用时 {time.perf_counter() - start:.1f} 秒）")
+    for level in reversed(RISK_LEVELS):
+        count = counts.get(level, 0)
+        print(f"   - {level}: {count:,} 人（{count / total:.1%}）" if total else f"   - {level}: 0 人")
+
+    if args.incremental:
+        save_state(args.state, state, model_id)
+        print(f"💾 评分状态已保存: {args.state}")
+        if last_state is not None:
+            summary, changes = risk_changes(last_state, state)
+            changes.to_csv(args.delta, index=False, encoding="utf-8-sig")
+            print("📊 与上次相比：" + "，".join(f"{name} {count:,} 人" for name, count in summary.items()))
+            moves = changes["变动"].value_counts()
+            print(f"✅ 风险等级变动明细已保存: {args.delta}（上升 {moves.get('上升', 0):,} 人，"
+                  f"下降 {moves.get('下降', 0):,} 人）")
+
+
+if __name__ == "__main__":
+    main()
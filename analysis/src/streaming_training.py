@@ -0,0 +1,255 @@
+"""
+离职预测模型流式（out-of-core）训练
+===================================================
+面向多年月度快照等超出内存的员工历史数据：按块读取一个或多个 CSV / Parquet 文件，
+用支持 partial_fit 的 SGD 逻辑回归逐个小批量增量训练，内存占用只取决于块大小，与历史长度无关。
+
+- 按员工编号哈希划分训练流与验证流：同一员工的全部快照落在同一侧，划分与文件顺序、分块大小无关
+- 第一遍扫描训练流：分块合并各数值特征的均值和方差（用于标准化）、无序类别特征的取值（用于独热编码）
+  以及两类样本数；类别权重与 class_weight='balanced' 相同，即 样本数 / (2 × 该类样本数)，
+  训练时作为 sample_weight 传入 partial_fit
+- 之后每轮（epoch）重新分块读取，块内打乱后按小批量训练（平均 SGD）；每批先预测再训练，
+  累计的对数损失即渐进验证损失（progressive validation），无需额外读取
+- 学习率在轮间自适应：sklearn 的 learning_rate="adaptive" 只在 fit 自身的迭代中生效，partial_fit 下始终为 eta0，
+  因此以固定学习率调用 partial_fit，由训练循环在某轮渐进验证损失未比此前最优值降低 TOL 以上时将学习率除以 ETA_DECAY
+- 训练结束后扫描验证流：按预测概率直方图累计两类人数，分箱计算 AUC（误差不超过 1 / 分箱数），
+  同时累计 Brier 分数和对数损失
+- 模型保存为 joblib 文件（StreamingModel：标准化 + 独热编码 + 逻辑回归，带 feature_names_in_ 和 predict_proba），
+  可直接用于 score_employees.py --model
+
+用法：
+    python streaming_training.py                                  # 使用汉化数据集 CSV
+    python streaming_training.py 快照/2022.parquet 快照/2023.parquet --epochs 3 --chunksize 200000
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import SGDClassifier
+
+from model_features import FEATURE_COLS, CATEGORICAL_COLS, TARGET_COL
+from score_employees import iter_chunks, ID_COL, STATUS_COL, DEFAULT_INPUT, OUTPUT_DIR
+
+DEFAULT_MODEL = OUTPUT_DIR / "attrition_model_streaming.joblib"
+CHUNK_SIZE = 100_000
+BATCH_SIZE = 1_000
+EPOCHS = 10
+HOLDOUT = 0.2
+AUC_BINS = 1_000
+ALPHA = 1e-3  # L2 正则强度
+ETA0 = 0.01   # 初始学习率
+ETA_DECAY = 5  # 渐进验证损失不再下降时学习率的缩小倍数（与 sklearn 的 adaptive 相同）
+TOL = 1e-4     # 视为损失下降的最小幅度
+
+
+# ==================== 数据流 ====================
+def holdout_mask(ids, fraction):
+    """按员工编号哈希划分验证流（确定性：同一员工总是落在同一侧）"""
+    return pd.util.hash_array(np.asarray(ids)) % 10_000 < fraction * 10_000
+
+
+def labels(chunk):
+    """目标变量：优先使用 0/1 编码列，否则由是否离职文本列换算"""
+    if TARGET_COL in chunk.columns:
+        return chunk[TARGET_COL].to_numpy(dtype=np.int64)
+    return (chunk[STATUS_COL] == "是").to_numpy(dtype=np.int64)
+
+
+def iter_split(paths, feature_cols, chunksize, holdout, part):
+    """按块读取全部文件，只产出训练流（part="train"）或验证流（part="holdout"）的行"""
+    columns = [ID_COL, TARGET_COL, STATUS_COL] + list(feature_cols)
+    for path in paths:
+        for chunk in iter_chunks(path, columns, chunksize):
+            missing = [col for col in feature_cols if col not in chunk.columns]
+            if missing:
+                raise ValueError(f"{path} 缺少特征列：{', '.join(missing)}")
+            if TARGET_COL not in chunk.columns and STATUS_COL not in chunk.columns:
+                raise ValueError(f"{path} 缺少目标列：{TARGET_COL} 或 {STATUS_COL}")
+            in_holdout = holdout_mask(chunk[ID_COL], holdout)
+            yield chunk[in_holdout if part == "holdout" else ~in_holdout]
+
+
+# ==================== 模型 ====================
+class FeatureStats:
+    """分块累计数值特征的均值与方差（Chan 合并公式）、类别特征取值和两类样本数"""
+
+    def __init__(self, numeric_cols, categorical_cols):
+        self.numeric_cols = list(numeric_cols)
+        self.categorical_cols = list(categorical_cols)
+        self.n = 0
+        self.mean = np.zeros(len(self.numeric_cols))
+        self.m2 = np.zeros(len(self.numeric_cols))
+        self.categories = {col: set() for col in self.categorical_cols}
+        self.class_counts = np.zeros(2, dtype=np.int64)
+
+    def update(self, chunk):
+        if not len(chunk):
+            return
+        values = chunk[self.numeric_cols].to_numpy(dtype=np.float64)
+        n, mean = len(values), values.mean(axis=0)
+        m2 = ((values - mean) ** 2).sum(axis=0)
+        delta, total = mean - self.mean, self.n + n
+        self.mean = self.mean + delta * n / total
+        self.m2 = self.m2 + m2 + delta ** 2 * self.n * n / total
+        self.n = total
+        for col in self.categorical_cols:
+            self.categories[col].update(chunk[col].dropna().unique().tolist())
+        self.class_counts += np.bincount(labels(chunk), minlength=2)[:2]
+
+    def scale(self):
+        """标准差（常数列取 1，避免除以 0）"""
+        std = np.sqrt(self.m2 / max(self.n, 1))
+        return np.where(std > 0, std, 1.0)
+
+    def class_weight(self):
+        """与 class_weight='balanced' 相同的类别权重"""
+        if (self.class_counts == 0).any():
+            raise ValueError(f"训练流中只有一类样本（留任 {self.class_counts[0]}，离职 {self.class_counts[1]}），无法训练")
+        return self.class_counts.sum() / (2 * self.class_counts)
+
+
+class StreamingModel:
+    """标准化数值特征 + 独热编码类别特征 + SGD 逻辑回归，predict_proba 与 sklearn 接口一致"""
+
+    def __init__(self, feature_cols, categorical_cols, stats, classifier):
+        self.feature_names_in_ = np.asarray(feature_cols, dtype=object)
+        self.numeric_cols = [col for col in feature_cols if col not in categorical_cols]
+        self.mean = stats.mean
+        self.scale = stats.scale()
+        self.categories = {col: np.asarray(sorted(stats.categories[col])) for col in categorical_cols}
+        self.classifier = classifier
+
+    def transform(self, X):
+        """特征矩阵：标准化后的数值列 + 各类别列的独热列（训练时未出现的取值全为 0）"""
+        numeric = (X[self.numeric_cols].to_numpy(dtype=np.float64) - self.mean) / self.scale
+        onehot = [X[col].to_numpy()[:, None] == values[None, :] for col, values in self.categories.items()]
+        return np.hstack([numeric] + onehot)
+
+    def predict_proba(self, X):
+        return self.classifier.predict_proba(self.transform(X))
+
+
+# ==================== 验证流评估 ====================
+class StreamingEvaluation:
+    """按概率直方图累计两类人数，分箱计算 AUC；同时累计 Brier 分数与对数损失"""
+
+    def __init__(self, bins=AUC_BINS):
+        self.bins = bins
+        self.positive = np.zeros(bins)
+        self.negative = np.zeros(bins)
+        self.squared_error = 0.0
+        self.log_loss = 0.0
+
+    def update(self, proba, y):
+        index = np.minimum((proba * self.bins).astype(np.int64), self.bins - 1)
+        self.positive += np.bincount(index[y == 1], minlength=self.bins)
+        self.negative += np.bincount(index[y == 0], minlength=self.bins)
+        self.squared_error += ((proba - y) ** 2).sum()
+        clipped = np.clip(proba, 1e-15, 1 - 1e-15)
+        self.log_loss -= (y * np.log(clipped) + (1 - y) * np.log(1 - clipped)).sum()
+
+    def summary(self):
+        n_pos, n_neg = self.positive.sum(), self.negative.sum()
+        n = n_pos + n_neg
+        # 每个正例与分数更低的负例计 1 分、与同一分箱的负例计 0.5 分
+        below = np.cumsum(self.negative) - self.negative
+        auc = (self.positive * (below + 0.5 * self.negative)).sum() / (n_pos * n_neg) if n_pos and n_neg else float("nan")
+        return {"样本数": int(n), "离职样本数": int(n_pos), "AUC": auc,
+                "Brier": self.squared_error / n if n else float("nan"),
+                "对数损失": self.log_loss / n if n else float("nan")}
+
+
+# ==================== 训练 ====================
+def train_streaming(paths, feature_cols=FEATURE_COLS, categorical_cols=CATEGORICAL_COLS, epochs=EPOCHS,
+                    chunksize=CHUNK_SIZE, batch_size=BATCH_SIZE, holdout=HOLDOUT, random_state=42):
+    """流式训练并在验证流上评估，返回 (StreamingModel, 评估指标字典)"""
+    categorical_cols = [col for col in categorical_cols if col in feature_cols]
+    numeric_cols = [col for col in feature_cols if col not in categorical_cols]
+
+    start = time.perf_counter()
+    stats = FeatureStats(numeric_cols, categorical_cols)
+    for chunk in iter_split(paths, feature_cols, chunksize, holdout, "train"):
+        stats.update(chunk)
+    class_weight = stats.class_weight()
+    print(f"  📐 第一遍扫描：训练流 {stats.n:,} 行（离职 {stats.class_counts[1]:,}），"
+          f"类别权重 留任 {class_weight[0]:.3f} / 离职 {class_weight[1]:.3f}，用时 {time.perf_counter() - start:.1f} 秒")
+
+    # 平均 SGD（average=True）输出历次更新的平均系数，对小批量噪声不敏感；
+    # 学习率由下方训练循环按轮调整（partial_fit 每次调用读取当前的 eta0）
+    classifier = SGDClassifier(loss="log_loss", alpha=ALPHA, learning_rate="constant", eta0=ETA0,
+                               average=True, random_state=random_state)
+    model = StreamingModel(feature_cols, categorical_cols, stats, classifier)
+    rng = np.random.default_rng(random_state)
+    fitted, best_loss = False, np.inf
+    for epoch in range(1, epochs + 1):
+        start = time.perf_counter()
+        loss, seen = 0.0, 0
+        for chunk in iter_split(paths, feature_cols, chunksize, holdout, "train"):
+            X, y = model.transform(chunk), labels(chunk)
+            order = rng.permutation(len(y))
+            for batch in range(0, len(order), batch_size):
+                rows = order[batch:batch + batch_size]
+                if fitted:
+                    proba = np.clip(classifier.predict_proba(X[rows])[:, 1], 1e-15, 1 - 1e-15)
+                    loss -= (y[rows] * np.log(proba) + (1 - y[rows]) * np.log(1 - proba)).sum()
+                    seen += len(rows)
+                classifier.partial_fit(X[rows], y[rows], classes=[0, 1], sample_weight=class_weight[y[rows]])
+                fitted = True
+        note = f"渐进验证对数损失 {loss / seen:.4f}，学习率 {classifier.eta0:g}" if seen else "首批无渐进验证"
+        print(f"    第 {epoch}/{epochs} 轮：{note}，用时 {time.perf_counter() - start:.1f} 秒")
+        if seen:
+            if loss / seen > best_loss - TOL:
+                classifier.eta0 /= ETA_DECAY
+            best_loss = min(best_loss, loss / seen)
+
+    evaluation = StreamingEvaluation()
+    for chunk in iter_split(paths, feature_cols, chunksize, holdout, "holdout"):
+        if len(chunk):
+            evaluation.update(model.predict_proba(chunk)[:, 1], labels(chunk))
+    return model, evaluation.summary()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="按块流式训练离职预测模型（数据量不受内存限制）")
+    parser.add_argument("inputs", nargs="*", default=[str(DEFAULT_INPUT)],
+                        help="汉化版 CSV / Parquet 文件，可多个（默认汉化数据集 CSV）")
+    parser.add_argument("-o", "--output", default=str(DEFAULT_MODEL), help="模型文件（joblib）")
+    parser.add_argument("--epochs", type=int, default=EPOCHS, help=f"训练轮数（默认 {EPOCHS}）")
+    parser.add_argument("--chunksize", type=int, default=CHUNK_SIZE, help=f"每块行数（默认 {CHUNK_SIZE:,}）")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help=f"小批量行数（默认 {BATCH_SIZE:,}）")
+    parser.add_argument("--holdout", type=float, default=HOLDOUT, help=f"验证流比例（默认 {HOLDOUT}）")
+    args = parser.parse_args()
+
+    print("="*60)
+    print("🌊 离职预测模型流式训练")
+    print("="*60)
+    missing = [path for path in args.inputs if not Path(path).exists()]
+    if missing:
+        print(f"❌ 错误: 找不到文件 {', '.join(missing)}")
+        return
+    if not 0 < args.holdout < 1:
+        print("❌ 验证流比例需在 0 到 1 之间")
+        return
+
+    start = time.perf_counter()
+    try:
+        model, metrics = train_streaming(args.inputs, epochs=args.epochs, chunksize=args.chunksize,
+                                         batch_size=args.batch_size, holdout=args.holdout)
+    except (ValueError, ImportError) as e:
+        print(f"❌ 训练失败: {e}")
+        return
+    joblib.dump(model, args.output)
+    print(f"✅ 模型已保存: {args.output}（总用时 {time.perf_counter() - start:.1f} 秒）")
+    print(f"📊 验证流 {metrics['样本数']:,} 行（离职 {metrics['离职样本数']:,}）："
+          f"AUC {metrics['AUC']:.3f}，Brier {metrics['Brier']:.4f}，对数损失 {metrics['对数损失']:.4f}")
+
+
+if __name__ == "__main__":
+    # 以模块名导入后运行：保存的模型类路径为 streaming_training.StreamingModel（而非 __main__），
+    # 评分脚本加载模型时可以找到该类
+    from streaming_training import main as _main
+    _main()
@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+"""
+高速 Excel 写出模块
+======================================
+与 translate_data_v5.apply_excel_formatting 输出相同的超级表样式（TableStyleMedium2 蓝色主题、
+微软雅黑、居中、百分比格式），但不再逐单元格创建 Font/Alignment 对象：
+
+1. 使用 openpyxl 只写（write_only）工作簿，按行流式写出，不在内存中保留整张工作表
+2. 标题、数据、百分比三种样式注册为共享的命名样式（NamedStyle），所有单元格只引用样式编号；
+   日期、日期时间、时间、时长各有一个数据样式，保留 openpyxl 按取值类型选定的数字格式
+3. 列宽在写出前根据 DataFrame 向量化计算（全角中文按 2 个字符宽度计），无需再遍历工作表；
+   column_widths 同时供各脚本中基于 openpyxl 的格式化函数使用
+"""
+
+import warnings
+import pandas as pd
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, Alignment, PatternFill, NamedStyle, numbers
+from openpyxl.worksheet.table import Table, TableStyleInfo
+from openpyxl.utils import get_column_letter
+
+# ==================== 共享命名样式 ====================
+HEADER_STYLE = "HR表头"
+DATA_STYLE = "HR数据"
+PERCENT_STYLE = "HR百分比"
+# openpyxl 为日期类取值选定的数字格式（见 openpyxl.utils.datetime.TIME_FORMATS）-> 对应的数据样式
+DATE_STYLES = {
+    numbers.FORMAT_DATE_YYYYMMDD2: "HR日期",
+    numbers.FORMAT_DATE_DATETIME: "HR日期时间",
+    numbers.FORMAT_DATE_TIME6: "HR时间",
+    numbers.FORMAT_DATE_TIMEDELTA: "HR时长",
+}
+MAX_COLUMN_WIDTH = 30
+
+# 全角字符（中日韩文字、全角标点及符号），在 Excel 中约占 2 个半角字符宽度
+_WIDE_CHAR_PATTERN = (r'[\u1100-\u115f\u2e80-\u303e\u3041-\u33ff\u3400-\u4dbf\u4e00-\u9fff'
+                      r'\ua000-\ua4cf\uac00-\ud7a3\uf900-\ufaff\ufe30-\ufe4f\uff00-\uff60\uffe0-\uffe6]')
+
+
+def _register_styles(workbook):
+    """在工作簿中注册标题、数据、百分比及各日期格式的命名样式（每个工作簿只注册一次，所有单元格共享）"""
+    center = Alignment(horizontal='center', vertical='center')
+    header = NamedStyle(name=HEADER_STYLE)
+    header.font = Font(name='微软雅黑', size=11, bold=True, color="FFFFFF")
+    header.fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
+    header.alignment = center
+    data = NamedStyle(name=DATA_STYLE)
+    data.font = Font(name='微软雅黑', size=11)
+    data.alignment = center
+    percent = NamedStyle(name=PERCENT_STYLE)
+    percent.font = Font(name='微软雅黑', size=11)
+    percent.alignment = center
+    percent.number_format = numbers.FORMAT_PERCENTAGE  # 0%
+    dates = []
+    for number_format, name in DATE_STYLES.items():
+        date = NamedStyle(name=name)
+        date.font = Font(name='微软雅黑', size=11)
+        date.alignment = center
+        date.number_format = number_format
+        dates.append(date)
+    for style in (header, data, percent, *dates):
+        workbook.add_named_style(style)
+
+
+def display_width(strings):
+    """向量化计算字符串的显示宽度：半角字符计 1，全角字符计 2"""
+    return strings.str.len() + strings.str.count(_WIDE_CHAR_PATTERN)
+
+
+def column_widths(df, max_width=MAX_COLUMN_WIDTH):
+    """
+    直接根据 DataFrame 计算各列列宽：列名与列中不同取值的最大显示宽度 + 2，上限 max_width
+    每列只对去重后的取值做一次向量化字符串运算，不访问工作表单元格
+    """
+    widths = []
+    for col in df.columns:
+        values = pd.Series(df[col].dropna().unique()).astype(str)
+        max_length = display_width(pd.Series([str(col)])).iloc[0]
+        if len(values):
+            max_length = max(max_length, display_width(values).max())
+        widths.append(int(min(max_length + 2, max_width)))
+    return widths
+
+
+def _column_values(series):
+    """将一列转换为 Python 对象列表，缺失值转为 None（写出为空单元格）"""
+    return series.astype(object).where(series.notna(), None).tolist()
+
+
+def _style_arrays(workbook, worksheet):
+    """解析各命名样式对应的样式数组，并预先登记到工作簿的单元格样式表中，之后写出单元格只需引用"""
+    arrays = {}
+    for name in (HEADER_STYLE, DATA_STYLE, PERCENT_STYLE, *DATE_STYLES.values()):
+        cell = WriteOnlyCell(worksheet)
+        cell.style = name
+        cell.style_id  # 登记样式数组
+        arrays[name] = cell._style
+    return arrays
+
+
+def _fill_sheet(worksheet, df, table_name, percent_cols, styles):
+    """向已创建的只写工作表写入一个 DataFrame：先设列宽，再流式写出标题行和数据行，最后登记超级表"""
+    for idx, width in enumerate(column_widths(df), start=1):
+        worksheet.column_dimensions[get_column_letter(idx)].width = width
+
+    header = []
+    for col in df.columns:
+        cell = WriteOnlyCell(worksheet, value=str(col))
+        cell._style = styles[HEADER_STYLE]
+        header.append(cell)
+    worksheet.append(header)
+
+    # 数据单元格直接共享样式数组（只写单元格写出后即丢弃，不会被修改）；
+    # 日期类取值改用与 openpyxl 所选数字格式对应的日期样式，不被列样式的常规格式覆盖
+    column_styles = [styles[PERCENT_STYLE if col in percent_cols else DATA_STYLE] for col in df.columns]
+    date_styles = {number_format: styles[name] for number_format, name in DATE_STYLES.items()}
+    columns = [_column_values(df[col]) for col in df.columns]
+    for values in zip(*columns):
+        row = []
+        for value, style in zip(values, column_styles):
+            cell = WriteOnlyCell(worksheet, value=value)
+            cell._style = date_styles[cell.number_format] if cell.data_type == "d" else style
+            row.append(cell)
+        worksheet.append(row)
+
+    ref = f"A1:{get_column_letter(max(len(df.columns), 1))}{len(df) + 1}"
+    tab = Table(displayName=table_name, ref=ref)
+    tab.tableStyleInfo = TableStyleInfo(
+        name="TableStyleMedium2",  # 蓝色主题
+        showFirstColumn=False,
+        showLastColumn=False,
+        showRowStripes=True,
+        showColumnStripes=False
+    )
+    # 只写模式无法回读标题行，需显式写入表格列名（openpyxl 对此固定给出提示，已手动处理故忽略）
+    tab._initialise_columns()
+    for table_col, name in zip(tab.tableColumns, df.columns):
+        table_col.name = str(name)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", UserWarning)
+        worksheet.add_table(tab)
+
+
+def write_formatted_workbook(path, sheets):
+    """
+    将多个 DataFrame 写为带超级表格式的 Excel 文件
+    sheets: [(工作表名, DataFrame, 超级表名, 百分比格式列), ...]
+    """
+    workbook = Workbook(write_only=True)
+    _register_styles(workbook)
+    worksheets = [workbook.create_sheet(sheet_name) for sheet_name, *_ in sheets]
+    if not worksheets:
+        workbook.save(path)
+        return
+    styles = _style_arrays(workbook, worksheets[0])
+    for worksheet, (_, df, table_name, percent_cols) in zip(worksheets, sheets):
+        _fill_sheet(worksheet, df, table_name, percent_cols, styles)
+    workbook.save(path)
+
+
+def write_formatted_excel(df, path, sheet_name, table_name, percent_cols=()):
+    """单工作表版本的 write_formatted_workbook"""
+    write_formatted_workbook(path, [(sheet_name, df, table_name, percent_cols)])
@@ -6,29 +6,46 @@ IBM HR 员工流失数据集 - 汉化脚本 v5.1
 
 功能：
 1. 将35个字段名翻译为更符合中文HR术语的命名（“教育程度”改为“学历”）
-2. 将分类变量的值按原数据集定义精准翻译
+2. 将分类变量的值按原数据集定义精准翻译（Categorical 引擎，仅翻译类别标签，结果为 category 类型）
 3. 为有序分类变量（如学历、满意度）保留原始数值作为编码列
 4. 为二元变量（是否离职、是否加班）创建0/1编码列（是否成年为常数列，不编码）
-5. 为无序分类变量（婚姻状况、出差频率）添加数值编码列（因子化编码）
+5. 为无序分类变量（婚姻状况、出差频率）添加数值编码列（按持久化、带版本号的编码字典查表，新值追加编码）
 6. 调薪幅度：将原始整数除以100，并设置为不带小数的百分比格式（如11→11%）
 7. 职级（JobLevel）为数值，仅翻译列名，不添加编码列
-8. 输出 Excel 文件，格式化为超级表（蓝色主题、自动列宽）
-9. 同时输出 CSV 文件（UTF-8 with BOM 编码），便于 GitHub 在线预览
+8. 输出 Excel 文件，格式化为超级表（蓝色主题、自动列宽，全角中文按双倍宽度计），默认使用只写工作簿 + 共享命名样式高速写出
+9. 同时输出 CSV 文件（UTF-8 with BOM 编码），便于 GitHub 在线预览；
+   以及 Parquet 列式文件（zstd 压缩，保留 category/小整数/浮点类型，可按列读取）
 10. 列顺序按国内阅读习惯及企业系统对接需求排列（员工编号为首列）
+11. 流式模式（--stream）：分块读取、逐块汉化并追加写入 CSV，峰值内存不随输入规模增长
 """
 
 import pandas as pd
+import numpy as np
+import json
 import os
 from pathlib import Path
 from openpyxl.styles import Font, Alignment, PatternFill, numbers
 from openpyxl.worksheet.table import Table, TableStyleInfo
 from openpyxl.utils import get_column_letter
+from excel_writer import write_formatted_excel, column_widths
+
+try:  # Parquet 列式输出为可选功能，需要 pyarrow
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
 
 # ==================== 配置区域 ====================
 INPUT_FILE = "data/WA_Fn-UseC_-HR-Employee-Attrition.csv"
 OUTPUT_DIR = "output"
 OUTPUT_EXCEL_FILE = os.path.join(OUTPUT_DIR, "IBM_HR_员工流失数据_本土化版.xlsx")
 OUTPUT_CSV_FILE = os.path.join(OUTPUT_DIR, "IBM_HR_员工流失数据_本土化版.csv")
+OUTPUT_PARQUET_FILE = os.path.join(OUTPUT_DIR, "IBM_HR_员工流失数据_本土化版.parquet")
+PARQUET_COMPRESSION = "zstd"
+CATEGORY_CODES_FILE = os.path.join(OUTPUT_DIR, "无序变量编码字典.json")
+FAST_EXCEL_WRITER = True   # 使用只写工作簿 + 共享命名样式的高速写出；False 时回退到逐单元格格式化
+CHUNK_SIZE = 100_000   # 流式模式每块读取的行数（--chunksize 可覆盖）
+CODE_DTYPE = "Int16"   # 列式输出中编码列的类型：可空整数，缺失值存为空值，各块类型一致
 
 # ==================== 1. 字段名翻译映射（本土化优化版）====================
 COLUMN_TRANSLATION = {
@@ -228,6 +245,13 @@ UNORDERED_EN_COLS = [
     'BusinessTravel'   # 出差频率
 ]
 
+# 无序变量的声明编码（列表下标即编码，与 v5.1 在原始数据上的 factorize 结果一致）
+# 实际使用的字典持久化在 CATEGORY_CODES_FILE 中：只追加不重排，新值追加在末尾并使版本号 +1
+UNORDERED_CATEGORY_CODES = {
+    'MaritalStatus': ['Single', 'Married', 'Divorced'],
+    'BusinessTravel': ['Travel_Rarely', 'Travel_Frequently', 'Non-Travel']
+}
+
 # ==================== 4. 基础列顺序（员工编号为首列）====================
 BASE_COLUMN_ORDER = [
     '员工编号',
@@ -258,10 +282,11 @@ def reorder_columns(df, base_order):
             final_cols.append(col)
     return df[final_cols]
 
-def apply_excel_formatting(worksheet):
+def apply_excel_formatting(worksheet, df):
     """
     应用 Excel 格式：超级表、字体、列宽、颜色
     超级表命名为 HRDATA
+    列宽由写入的 DataFrame 直接计算（见 excel_writer.column_widths）
     同时设置调薪幅度列为不带小数的百分比格式（如11%）
     """
     max_row = worksheet.max_row
@@ -292,20 +317,9 @@ def apply_excel_formatting(worksheet):
             cell.font = Font(name='微软雅黑', size=11)
             cell.alignment = Alignment(horizontal='center', vertical='center')
     
-    # 自动调整列宽（基于内容长度）
-    for col in worksheet.columns:
-        max_length = 0
-        col_letter = get_column_letter(col[0].column)
-        for cell in col:
-            try:
-                if cell.value:
-                    max_length = max(max_length, len(str(cell.value)))
-            except:
-                pass
-        adjusted_width = max_length + 2
-        if adjusted_width > 30:
-            adjusted_width = 30
-        worksheet.column_dimensions[col_letter].width = adjusted_width
+    # 自动调整列宽（基于内容显示宽度，全角中文按 2 计）
+    for idx, width in enumerate(column_widths(df), start=1):
+        worksheet.column_dimensions[get_column_letter(idx)].width = width
     
     # 找到“调薪幅度”列，设置为不带小数的百分比格式（FORMAT_PERCENTAGE 对应 0%）
     for idx, cell in enumerate(worksheet[1]):
@@ -315,48 +329,92 @@ def apply_excel_formatting(worksheet):
                 worksheet[f"{col_letter}{row_num}"].number_format = numbers.FORMAT_PERCENTAGE
             break
 
-def main():
-    print("="*60)
-    print("IBM HR 员工流失数据集 - 汉化工具 v5.1")
-    print("="*60)
-    
-    # 检查输入文件
-    if not os.path.exists(INPUT_FILE):
-        print(f"❌ 错误: 找不到输入文件 {INPUT_FILE}")
-        print("请确保 data/ 目录下存在原始数据文件")
-        return
-    
-    # 创建输出目录
-    Path(OUTPUT_DIR).mkdir(exist_ok=True)
-    print(f"📁 输出目录: {OUTPUT_DIR}/")
-    
-    # 读取原始数据（保留一份原始副本用于提取编码）
-    print(f"\n📖 读取数据: {INPUT_FILE}")
-    try:
-        df_original = pd.read_csv(INPUT_FILE)
-        print(f"✅ 读取成功! 共 {len(df_original):,} 行, {len(df_original.columns)} 列")
-    except Exception as e:
-        print(f"❌ 读取失败: {e}")
-        return
+def load_category_codes(path=CATEGORY_CODES_FILE):
+    """
+    读取持久化的无序变量编码字典，格式为 {"version": 版本号, "columns": {英文列名: [取值, ...]}}
+    文件不存在时使用声明编码 UNORDERED_CATEGORY_CODES（版本 1）；文件中缺少的列从声明编码补齐
+    """
+    codes = {"version": 1, "columns": {}}
+    if os.path.exists(path):
+        with open(path, encoding='utf-8') as f:
+            codes = json.load(f)
+    for en_col, values in UNORDERED_CATEGORY_CODES.items():
+        codes["columns"].setdefault(en_col, list(values))
+    return codes
+
+def save_category_codes(codes, path=CATEGORY_CODES_FILE):
+    """保存无序变量编码字典（UTF-8，保留中文可读）"""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(codes, f, ensure_ascii=False, indent=2)
+
+def encode_with_categories(series, categories):
+    """
+    按编码字典对一列做向量化查表编码，返回 (编码数组, 新增取值列表)
+    - 字典中已有的值使用固定编码，缺失值编码为 -1（与 factorize 一致）
+    - 字典中没有的新值按出现顺序追加到 categories 末尾（原地修改），已有编码不变
+    """
+    codes = pd.Categorical(series, categories=categories).codes
+    unknown = (codes == -1) & series.notna().to_numpy()
+    new_values = []
+    if unknown.any():
+        new_values = list(pd.unique(series[unknown]))
+        categories.extend(new_values)
+        codes = pd.Categorical(series, categories=categories).codes
+    return codes.astype('int64'), new_values
+
+def translate_values(series, mapping):
+    """
+    分类变量值翻译引擎：先将列转换为 Categorical，再只翻译类别标签
+    - 计算量与不同取值个数成正比，而非行数；结果保持 category 类型以节省内存
+    - 类别 = 映射表中的全部原始值 + 数据中出现的其他值，后者保留原值（与 map().fillna() 结果一致），
+      因此同一映射表下各块的类别集合稳定
+    """
+    observed = pd.unique(series.dropna())
+    categories = list(mapping) + [v for v in observed if v not in mapping]
+    cat = pd.Categorical(series, categories=categories)
+    labels = [mapping.get(v, v) for v in categories]
+    unique_labels = list(dict.fromkeys(labels))
+    if len(unique_labels) == len(labels):
+        translated = cat.rename_categories(labels)
+    else:
+        # 多个原始值译为同一标签时，在类别层面合并编码（末尾的 -1 对应缺失值）
+        label_pos = {label: i for i, label in enumerate(unique_labels)}
+        remap = np.array([label_pos[label] for label in labels] + [-1])
+        translated = pd.Categorical.from_codes(remap[cat.codes], unique_labels)
+    return pd.Series(translated, index=series.index, name=series.name)
+
+def localize_frame(df_original, category_codes=None, verbose=True):
+    """
+    对一块原始数据执行汉化核心步骤：调薪幅度换算、翻译列名、添加编码列、翻译变量值、重排列
+    - category_codes: 无序变量编码字典（见 load_category_codes），在多次调用间共享；
+      各块按同一字典查表编码，新值追加编码并使版本号 +1，已有编码跨块、跨月保持不变
+    - verbose: 是否打印每一步的进度（流式模式下按块处理时关闭）
+    """
+    if category_codes is None:
+        category_codes = load_category_codes()
     
     # ==================== 调薪幅度转换为小数 ====================
     if 'PercentSalaryHike' in df_original.columns:
         df_original['PercentSalaryHike'] = df_original['PercentSalaryHike'] / 100
-        print("  已将调薪幅度原始值除以100，准备设为百分比格式")
+        if verbose:
+            print("  已将调薪幅度原始值除以100，准备设为百分比格式")
     
     # 复制一份用于翻译（此时调薪幅度已为小数）
     df = df_original.copy()
     
     # 翻译列名
-    print("\n🔄 步骤1: 翻译列名...")
+    if verbose:
+        print("\n🔄 步骤1: 翻译列名...")
     df.rename(columns=COLUMN_TRANSLATION, inplace=True)
-    print("✅ 列名翻译完成")
+    if verbose:
+        print("✅ 列名翻译完成")
     
     # 构建英-中列名映射字典
     en_to_cn = COLUMN_TRANSLATION
     
     # ==================== 添加编码列 ====================
-    print("\n🔄 步骤2: 为有序变量、二元变量和无序变量添加数值编码列...")
+    if verbose:
+        print("\n🔄 步骤2: 为有序变量、二元变量和无序变量添加数值编码列...")
     code_columns_added = []
     
     # 2.1 为有序分类变量添加原始数值编码（职级不包含在内）
@@ -367,7 +425,8 @@ def main():
             # 直接从原始数据中取出该列的值（本身就是数值）
             df[code_col] = df_original[en_col]
             code_columns_added.append(code_col)
-            print(f"  ✓ 添加编码列: {code_col} (有序变量)")
+            if verbose:
+                print(f"  ✓ 添加编码列: {code_col} (有序变量)")
     
     # 2.2 为二元变量创建0/1编码（不包括是否成年）
     for en_col, mapping in BINARY_EN_COLS.items():
@@ -376,47 +435,173 @@ def main():
             code_col = cn_col + "编码"
             df[code_col] = df_original[en_col].map(mapping)
             code_columns_added.append(code_col)
-            print(f"  ✓ 添加编码列: {code_col} (二元变量)")
+            if verbose:
+                print(f"  ✓ 添加编码列: {code_col} (二元变量)")
     
     # 2.3 为无序分类变量创建因子化编码（婚姻状况、出差频率）
     for en_col in UNORDERED_EN_COLS:
         if en_col in df_original.columns:
             cn_col = en_to_cn[en_col]
             code_col = cn_col + "编码"
-            # 使用 factorize 生成 0,1,2... 编码（顺序与原始值出现顺序相关）
-            codes, uniques = pd.factorize(df_original[en_col])
+            # 按持久化编码字典查表，编码与数据中值的出现顺序无关
+            categories = category_codes["columns"].setdefault(en_col, [])
+            codes, new_values = encode_with_categories(df_original[en_col], categories)
+            if new_values:
+                category_codes["version"] += 1
+                print(f"  ⚠️ {cn_col} 出现新取值 {new_values}，已追加编码（字典版本 v{category_codes['version']}）")
             df[code_col] = codes
             code_columns_added.append(code_col)
-            print(f"  ✓ 添加编码列: {code_col} (无序变量，编码映射: {dict(zip(uniques, range(len(uniques))))})")
+            if verbose:
+                print(f"  ✓ 添加编码列: {code_col} (无序变量，编码映射: {dict(zip(categories, range(len(categories))))})")
     
-    print(f"✅ 共添加 {len(code_columns_added)} 个编码列")
+    if verbose:
+        print(f"✅ 共添加 {len(code_columns_added)} 个编码列")
     
     # ==================== 翻译变量值 ====================
-    print("\n🔄 步骤3: 翻译分类变量值...")
+    if verbose:
+        print("\n🔄 步骤3: 翻译分类变量值...")
     translated_count = 0
     for col in df.columns:
         if col in VALUE_TRANSLATION:
             try:
-                df[col] = df[col].map(VALUE_TRANSLATION[col]).fillna(df[col])
-                print(f"  ✓ 翻译列: {col}")
+                df[col] = translate_values(df[col], VALUE_TRANSLATION[col])
+                if verbose:
+                    print(f"  ✓ 翻译列: {col}")
                 translated_count += 1
             except Exception as e:
                 print(f"  ⚠️ 列 {col} 翻译出错: {e}")
-    print(f"✅ 共翻译 {translated_count} 列的分类变量")
+    if verbose:
+        print(f"✅ 共翻译 {translated_count} 列的分类变量")
     
     # 步骤4: 按照国内阅读习惯重新排序列
-    print("\n🔄 步骤4: 重新排序列（员工编号为首列，其他按国内习惯）...")
+    if verbose:
+        print("\n🔄 步骤4: 重新排序列（员工编号为首列，其他按国内习惯）...")
     df = reorder_columns(df, BASE_COLUMN_ORDER)
-    print("✅ 列排序完成")
+    if verbose:
+        print("✅ 列排序完成")
+    return df
+
+def columnar_frame(df):
+    """
+    转换为列式存储使用的数据类型（返回浅拷贝，不修改原表）：
+    - 翻译后的分类列保持 category 类型（Parquet 中存为字典编码）
+    - 编码列统一转为 CODE_DTYPE（可空 Int16）：类型事先固定，不随各块的取值范围或缺失值变化，
+      流式模式下后续块与第一块的 Parquet 表结构一致
+    - 调薪幅度等数值列保持原类型
+    """
+    out = df.copy(deep=False)
+    for col in out.columns:
+        if col.endswith("编码"):
+            out[col] = out[col].astype(CODE_DTYPE)
+    return out
+
+def main_streaming(chunksize=CHUNK_SIZE):
+    """
+    流式模式：按固定行数分块读取 CSV，逐块汉化后追加写入 CSV 文件
+    - 同一时刻只有一块数据在内存中，峰值内存与输入文件大小无关
+    - 各块按同一份持久化编码字典编码，输出与整表模式逐行一致
+    - Excel 单表上限 1,048,576 行，流式模式仅输出 CSV
+    """
+    print("="*60)
+    print("IBM HR 员工流失数据集 - 汉化工具 v5.1（流式模式）")
+    print("="*60)
+    
+    if not os.path.exists(INPUT_FILE):
+        print(f"❌ 错误: 找不到输入文件 {INPUT_FILE}")
+        print("请确保 data/ 目录下存在原始数据文件")
+        return
+    
+    Path(OUTPUT_DIR).mkdir(exist_ok=True)
+    print(f"📁 输出目录: {OUTPUT_DIR}/")
+    print(f"\n📖 分块读取数据: {INPUT_FILE}（每块 {chunksize:,} 行）")
+    
+    category_codes = load_category_codes()
+    total_rows = 0
+    attrition_counts = {}
+    parquet_writer = None
+    if pq is None:
+        print("⚠️ 未安装 pyarrow，跳过 Parquet 输出（pip install pyarrow）")
+    try:
+        # 只打开一次文件句柄，BOM 仅在文件开头写入一次
+        with open(OUTPUT_CSV_FILE, 'w', encoding='utf-8-sig', newline='') as f:
+            for i, chunk in enumerate(pd.read_csv(INPUT_FILE, chunksize=chunksize)):
+                df = localize_frame(chunk, category_codes, verbose=False)
+                df.to_csv(f, index=False, header=(i == 0))
+                if pq is not None:
+                    # 每块写为一个行组，后续块沿用第一块的表结构（编码列类型已由 columnar_frame 固定）
+                    schema = parquet_writer.schema if parquet_writer else None
+                    table = pa.Table.from_pandas(columnar_frame(df), schema=schema, preserve_index=False)
+                    if parquet_writer is None:
+                        parquet_writer = pq.ParquetWriter(OUTPUT_PARQUET_FILE, table.schema,
+                                                          compression=PARQUET_COMPRESSION)
+                    parquet_writer.write_table(table)
+                total_rows += len(df)
+                if '是否离职' in df.columns:
+                    for value, count in df['是否离职'].value_counts().items():
+                        attrition_counts[value] = attrition_counts.get(value, 0) + count
+                print(f"  ✓ 第 {i + 1} 块: {len(df):,} 行（累计 {total_rows:,} 行）")
+    except Exception as e:
+        print(f"❌ 流式处理失败: {e}")
+        return
+    finally:
+        if parquet_writer is not None:
+            parquet_writer.close()
+    
+    print(f"✅ CSV 文件保存成功: {OUTPUT_CSV_FILE}（共 {total_rows:,} 行，UTF-8 with BOM 编码）")
+    if parquet_writer is not None:
+        print(f"✅ Parquet 文件保存成功: {OUTPUT_PARQUET_FILE}（{PARQUET_COMPRESSION} 压缩）")
+    save_category_codes(category_codes)
+    print(f"📒 无序变量编码字典 v{category_codes['version']}: {CATEGORY_CODES_FILE}")
+    for en_col, categories in category_codes["columns"].items():
+        print(f"  {COLUMN_TRANSLATION[en_col]}: {dict(zip(categories, range(len(categories))))}")
+    if total_rows and attrition_counts:
+        print(f"\n📉 离职率: {attrition_counts.get('是', 0) / total_rows:.2%}")
+        print(f"   - 离职人数: {attrition_counts.get('是', 0)}")
+        print(f"   - 留任人数: {attrition_counts.get('否', 0)}")
+    print("\n⚠️ 流式模式不输出 Excel 文件（Excel 单表行数上限 1,048,576）")
+
+def main():
+    print("="*60)
+    print("IBM HR 员工流失数据集 - 汉化工具 v5.1")
+    print("="*60)
+    
+    # 检查输入文件
+    if not os.path.exists(INPUT_FILE):
+        print(f"❌ 错误: 找不到输入文件 {INPUT_FILE}")
+        print("请确保 data/ 目录下存在原始数据文件")
+        return
+    
+    # 创建输出目录
+    Path(OUTPUT_DIR).mkdir(exist_ok=True)
+    print(f"📁 输出目录: {OUTPUT_DIR}/")
+    
+    # 读取原始数据（保留一份原始副本用于提取编码）
+    print(f"\n📖 读取数据: {INPUT_FILE}")
+    try:
+        df_original = pd.read_csv(INPUT_FILE)
+        print(f"✅ 读取成功! 共 {len(df_original):,} 行, {len(df_original.columns)} 列")
+    except Exception as e:
+        print(f"❌ 读取失败: {e}")
+        return
+    
+    category_codes = load_category_codes()
+    df = localize_frame(df_original, category_codes)
+    del df_original
+    save_category_codes(category_codes)
+    print(f"📒 无序变量编码字典 v{category_codes['version']} 已保存: {CATEGORY_CODES_FILE}")
     
     # 保存 Excel 文件并应用格式
     print(f"\n💾 步骤5: 保存并格式化 Excel 文件 - {OUTPUT_EXCEL_FILE}")
     try:
-        with pd.ExcelWriter(OUTPUT_EXCEL_FILE, engine='openpyxl') as writer:
-            df.to_excel(writer, sheet_name='数据', index=False)
-            workbook = writer.book
-            worksheet = writer.sheets['数据']
-            apply_excel_formatting(worksheet)
+        if FAST_EXCEL_WRITER:
+            write_formatted_excel(df, OUTPUT_EXCEL_FILE, sheet_name='数据', table_name='HRDATA',
+                                  percent_cols=['调薪幅度'])
+        else:
+            with pd.ExcelWriter(OUTPUT_EXCEL_FILE, engine='openpyxl') as writer:
+                df.to_excel(writer, sheet_name='数据', index=False)
+                workbook = writer.book
+                worksheet = writer.sheets['数据']
+                apply_excel_formatting(worksheet, df)
         print("✅ Excel 文件保存成功（已应用超级表样式，表格名称：HRDATA）")
     except Exception as e:
         print(f"❌ 保存 Excel 失败: {e}")
@@ -431,6 +616,18 @@ def main():
     except Exception as e:
         print(f"❌ 保存 CSV 失败: {e}")
     
+    # 保存 Parquet 文件（列式存储，保留数据类型，供下游按列快速读取）
+    print(f"\n💾 步骤7: 保存 Parquet 文件 - {OUTPUT_PARQUET_FILE}")
+    if pq is None:
+        print("⚠️ 未安装 pyarrow，跳过 Parquet 输出（pip install pyarrow）")
+    else:
+        try:
+            columnar_frame(df).to_parquet(OUTPUT_PARQUET_FILE, engine='pyarrow',
+                                          compression=PARQUET_COMPRESSION, index=False)
+            print(f"✅ Parquet 文件保存成功（{PARQUET_COMPRESSION} 压缩，分类列为 category，编码列为可空 Int16 类型）")
+        except Exception as e:
+            print(f"❌ 保存 Parquet 失败: {e}")
+    
     # 预览
     print("\n📊 数据预览 (前5行，关键列):")
     print("="*80)
@@ -449,6 +646,7 @@ def main():
     print(f"\n✨ 完成！输出文件位于 {OUTPUT_DIR} 目录：")
     print(f"   - Excel: {OUTPUT_EXCEL_FILE}")
     print(f"   - CSV:   {OUTPUT_CSV_FILE}")
+    print(f"   - Parquet: {OUTPUT_PARQUET_FILE}")
     print("\n📝 版本说明: v5.1")
     print("   - 学历: 1->大专以下,2->大专,3->本科,4->硕士,5->博士")
     print("   - 专业（原教育领域）")
@@ -456,12 +654,23 @@ def main():
     print("   - 是否成年为常数列，仅翻译，不添加编码列")
     print("   - 为有序分类变量（学历、满意度等）添加了原始数值编码列")
     print("   - 为二元变量（是否离职、是否加班）添加了0/1编码列")
-    print("   - 为婚姻状况、出差频率添加了因子化编码列（便于建模）")
+    print("   - 为婚姻状况、出差频率添加了编码列（按持久化编码字典查表，跨批次编码稳定）")
     print("   - 调薪幅度已除以100并设置为不带小数的百分比格式（如11→11%）")
     print("   - 输出 Excel 格式（超级表样式：蓝色主题、微软雅黑、自适应列宽，表格名称 HRDATA）")
     print("   - 同时输出 CSV 文件（UTF-8 with BOM 编码），便于 GitHub 在线预览")
+    print("   - 同时输出 Parquet 列式文件（保留数据类型，支持按列读取）")
     print("   - 员工编号置于首列，符合企业系统对接习惯")
     print("   - 其他列按国内HR阅读习惯排列")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    import argparse
+    parser = argparse.ArgumentParser(description="IBM HR 员工流失数据集汉化工具")
+    parser.add_argument("--stream", action="store_true",
+                        help="流式模式：分块读取并追加写入 CSV，适用于超大输入文件")
+    parser.add_argument("--chunksize", type=int, default=CHUNK_SIZE,
+                        help=f"流式模式每块行数（默认 {CHUNK_SIZE:,}）")
+    args = parser.parse_args()
+    if args.stream:
+        main_streaming(args.chunksize)
+    else:
+        main()
\ No newline at end of file